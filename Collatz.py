@@ -1,10 +1,506 @@
-a=int(input("number: "))
-b=a
-i=0
-while a > 1:
-    if a % 2:
-        a=(3*a)+1
-    else:
-        a=a/2
-    i+=1
-print(f"{b}は{i}回で{a}になります。")
\ No newline at end of file
+import argparse
+import array
+import collections
+import csv
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # --engine numpy を使うときだけ必要
+    np = None
+
+ENGINES = ("python", "numpy")
+SHARD_SIZE = 1 << 20  # 1 シャードあたりの開始値の数
+NUMPY_BATCH_SIZE = 1 << 16  # numpy エンジンで同時に進める開始値の数
+INT64_SAFE = ((1 << 63) - 1 - 1) // 3  # これ以下なら 3n+1 が int64 に収まる
+MEMO_LIMIT = 1 << 24  # memo に停止時間を保存する値の上限 (array('H') で 32 MiB)
+MEMO_MAX = (1 << 16) - 1  # 'H' に入る最大値。memo には停止時間 + 1 を保存する
+EXPORT_FORMATS = ("csv", "binary")
+CSV_FIELDNAMES = ["start", "steps", "peak", "path"]
+BINARY_MAGIC = b"CLZ1"
+WRITE_CHUNK_BYTES = 1 << 20  # この大きさまでバッファしてからファイルに書く
+
+
+def stopping_time(n: int) -> int:
+    """n が 1 になるまでのステップ数 (整数演算のみ)。"""
+
+    if n < 1:
+        raise ValueError("1 以上の整数を指定してください。")
+    steps = 0
+    while n > 1:
+        if n & 1:
+            # 奇数の次は必ず偶数なので 2 ステップまとめて進める
+            n = (3 * n + 1) >> 1
+            steps += 2
+        else:
+            n >>= 1
+            steps += 1
+    return steps
+
+
+def trajectory(n: int) -> Iterator[int]:
+    """n から 1 までの軌道を 1 ステップずつ返す (n と 1 を含む)。"""
+
+    if n < 1:
+        raise ValueError("1 以上の整数を指定してください。")
+    yield n
+    while n > 1:
+        n = 3 * n + 1 if n & 1 else n >> 1
+        yield n
+
+
+def excursion(n: int) -> Tuple[int, int]:
+    """(停止時間, 軌道の最大値)。軌道は保持しない。"""
+
+    if n < 1:
+        raise ValueError("1 以上の整数を指定してください。")
+    steps, peak = 0, n
+    while n > 1:
+        if n & 1:
+            n = 3 * n + 1
+            if n > peak:
+                peak = n
+            n >>= 1
+            steps += 2
+        else:
+            n >>= 1
+            steps += 1
+    return steps, peak
+
+
+class TrajectoryStats:
+    """範囲全体の集計を 1 パスで行う: 停止時間のヒストグラムと最大値の記録表。"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_steps = 0
+        self.histogram: Dict[int, int] = collections.Counter()
+        self.excursion_records: List[Tuple[int, int, int]] = []  # (start, peak, steps)
+
+    def add(self, start: int, steps: int, peak: int) -> None:
+        self.count += 1
+        self.total_steps += steps
+        self.histogram[steps] += 1
+        if not self.excursion_records or peak > self.excursion_records[-1][1]:
+            self.excursion_records.append((start, peak, steps))
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "average_steps": self.total_steps / self.count if self.count else 0,
+            "max_steps": max(self.histogram, default=0),
+            "histogram": dict(sorted(self.histogram.items())),
+            "excursion_records": list(self.excursion_records),
+        }
+
+
+class TrajectoryCSVWriter:
+    """1 行に 1 軌道 (start, steps, peak, 空白区切りの path) を書きます。"""
+
+    def __init__(self, file) -> None:
+        self.file = file
+        self.writer = csv.writer(file)
+        self.writer.writerow(CSV_FIELDNAMES)
+        self.rows: List[Sequence[object]] = []
+        self.buffered = 0
+
+    def write(self, start: int, path: Sequence[int]) -> None:
+        self.rows.append((start, len(path) - 1, max(path), " ".join(map(str, path))))
+        self.buffered += len(self.rows[-1][3])
+        if self.buffered >= WRITE_CHUNK_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        self.writer.writerows(self.rows)
+        self.rows.clear()
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _append_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+class TrajectoryBinaryWriter:
+    """BINARY_MAGIC の後に、軌道ごとに start, 値の個数, 値を LEB128 の varint で並べます。"""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.buffer = bytearray(BINARY_MAGIC)
+
+    def write(self, start: int, path: Sequence[int]) -> None:
+        buffer = self.buffer
+        _append_varint(buffer, start)
+        _append_varint(buffer, len(path))
+        for value in path:
+            _append_varint(buffer, value)
+        if len(buffer) >= WRITE_CHUNK_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def load_binary_trajectories(path: str) -> Iterator[Tuple[int, List[int]]]:
+    """TrajectoryBinaryWriter の出力を (start, path) の順に読み戻す。"""
+
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError(f"{path} はコラッツ軌道のバイナリではありません。")
+    offset = len(BINARY_MAGIC)
+    while offset < len(data):
+        start, offset = _read_varint(data, offset)
+        length, offset = _read_varint(data, offset)
+        values = []
+        for _ in range(length):
+            value, offset = _read_varint(data, offset)
+            values.append(value)
+        yield start, values
+
+
+def export_trajectories(
+    first: int, last: int, writer=None, stats: TrajectoryStats | None = None
+) -> TrajectoryStats:
+    """first..last の軌道を writer に流し、同じパスで stats を集計する。
+
+    保持する軌道は常に 1 本だけ。writer が None なら集計だけを行う。
+    """
+
+    stats = stats if stats is not None else TrajectoryStats()
+    for start in range(first, last + 1):
+        if writer is None:
+            steps, peak = excursion(start)
+        else:
+            path = list(trajectory(start))
+            writer.write(start, path)
+            steps, peak = len(path) - 1, max(path)
+        stats.add(start, steps, peak)
+    if writer is not None:
+        writer.close()
+    return stats
+
+
+def new_memo(limit: int, seed: bytes = b"") -> array.array:
+    """長さ limit の memo。seed (seed_memo の結果) があれば先頭に写す。"""
+
+    memo = array.array("H", bytes(2 * limit))
+    memo[1] = 1
+    if seed:
+        known = array.array("H", seed[: 2 * limit])
+        memo[: len(known)] = known
+    return memo
+
+
+def seed_memo(size: int, engine: str = "python") -> bytes:
+    """1..size-1 を埋めた memo (停止時間 + 1) を bytes で返す。シャードの初期値用。"""
+
+    memo = array.array("H", [0])
+    if engine == "numpy":
+        times = stopping_times_numpy(1, size - 1)
+    else:
+        times = iter_stopping_times(1, size - 1)
+    memo.extend(min(steps + 1, MEMO_MAX) for steps in times)
+    return memo.tobytes()
+
+
+def iter_stopping_times(
+    first: int, last: int, memo_limit: int = MEMO_LIMIT, seed: bytes = b""
+) -> Iterator[int]:
+    """first..last の停止時間を順に返す。
+
+    memo_limit 未満の値の停止時間を array('H') に保存し、軌道が既知の値に
+    落ちた時点で打ち切る。memo には停止時間 + 1 を入れ、0 を未計算とする。
+    """
+
+    if first < 1:
+        raise ValueError("1 以上の整数を指定してください。")
+    limit = max(2, min(memo_limit, last + 1))
+    memo = new_memo(limit, seed)
+    for n in range(first, last + 1):
+        value, steps = n, 0
+        while value >= limit or not memo[value]:
+            if value & 1:
+                value = (3 * value + 1) >> 1
+                steps += 2
+            else:
+                value >>= 1
+                steps += 1
+        total = steps + memo[value] - 1
+        if n < limit and total < MEMO_MAX:
+            memo[n] = total + 1
+        yield total
+
+
+def iter_stopping_times_numpy(
+    first: int, last: int, memo_limit: int = MEMO_LIMIT, seed: bytes = b""
+) -> Iterator[array.array]:
+    """first..last の停止時間を NumPy で計算し、NUMPY_BATCH_SIZE 個ずつ array('H') で返す。
+
+    保持するのは memo と 1 バッチ分だけなので、範囲が広くてもメモリは増えない。
+    NUMPY_BATCH_SIZE 個の開始値を同じステップで進め、1 か memo の既知の値に
+    達したものはアクティブ集合から外す。3n+1 が int64 を超えそうな値だけ
+    Python の int に移して stopping_time で続きを数える。INT64_SAFE を超える
+    開始値は最初から stopping_time で数える。
+    """
+
+    limit = max(2, min(memo_limit, last + 1))
+    # iter_stopping_times と同じく停止時間 + 1 を入れる
+    memo = np.frombuffer(new_memo(limit, seed), dtype=np.uint16).copy()
+    array_last = min(last, INT64_SAFE)  # これより大きい開始値は int64 の配列に入れない
+    for start in range(first, array_last + 1, NUMPY_BATCH_SIZE):
+        stop = min(start + NUMPY_BATCH_SIZE, array_last + 1)
+        steps = np.zeros(stop - start, dtype=np.int64)
+        active = np.arange(stop - start)
+        current = np.arange(start, stop, dtype=np.int64)
+        while active.size:
+            known = memo[np.minimum(current, limit - 1)].astype(np.int64)
+            known[current >= limit] = 0
+            done = known > 0
+            steps[active[done]] += known[done] - 1
+            running = ~done
+            active, current = active[running], current[running]
+
+            large = current > INT64_SAFE
+            if large.any():
+                for index, value in zip(active[large], current[large]):
+                    steps[index] += stopping_time(int(value))
+                active, current = active[~large], current[~large]
+
+            odd = current & 1
+            current = np.where(odd == 1, (3 * current + 1) >> 1, current >> 1)
+            steps[active] += 1 + odd
+        if start < limit:
+            end = min(stop, limit)
+            stored = steps[: end - start] + 1
+            stored[stored > MEMO_MAX] = 0  # 'H' に入らない値は未計算のままにする
+            memo[start:end] = stored
+        yield array.array("H", steps.astype(np.uint16).tobytes())
+    for start in range(max(first, INT64_SAFE + 1), last + 1, NUMPY_BATCH_SIZE):
+        stop = min(start + NUMPY_BATCH_SIZE, last + 1)
+        yield array.array("H", map(stopping_time, range(start, stop)))
+
+
+def stopping_times_numpy(
+    first: int, last: int, memo_limit: int = MEMO_LIMIT, seed: bytes = b""
+) -> array.array:
+    """iter_stopping_times_numpy の結果を 1 つの array('H') にまとめる (シャード用)。"""
+
+    times = array.array("H")
+    for batch in iter_stopping_times_numpy(first, last, memo_limit, seed):
+        times.extend(batch)
+    return times
+
+
+def run_shard(task: Tuple[str, int, int, int, bytes]) -> array.array:
+    engine, first, last, memo_limit, seed = task
+    if engine == "numpy":
+        return stopping_times_numpy(first, last, memo_limit, seed)
+    return array.array("H", iter_stopping_times(first, last, memo_limit, seed))
+
+
+def iter_stopping_times_sharded(
+    engine: str, first: int, last: int, workers: int, memo_limit: int = MEMO_LIMIT
+) -> Iterator[int]:
+    """SHARD_SIZE 個ずつのシャードに分けて実行し、シャード順に返します。
+
+    memo はシャードごとに別なので、SHARD_SIZE 未満の値の停止時間を先に求めて
+    各シャードの memo の初期値として渡す。
+    """
+
+    seed = b""
+    if last >= SHARD_SIZE:
+        seed = seed_memo(min(SHARD_SIZE, memo_limit), engine)
+    tasks = [
+        (engine, start, min(start + SHARD_SIZE - 1, last), memo_limit, seed)
+        for start in range(first, last + 1, SHARD_SIZE)
+    ]
+    if workers == 1:
+        for shard in map(run_shard, tasks):
+            yield from shard
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard in executor.map(run_shard, tasks):
+                yield from shard
+
+
+def record_holders(first: int, times: Iterator[int]) -> List[Tuple[int, int]]:
+    """それまでのどの値よりも停止時間が長い (n, 停止時間) の一覧。"""
+
+    records = []
+    best = -1
+    for n, steps in enumerate(times, first):
+        if steps > best:
+            best = steps
+            records.append((n, steps))
+    return records
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="コラッツ数列が 1 になるまでのステップ数を求めます。"
+    )
+    parser.add_argument(
+        "--range",
+        type=int,
+        nargs=2,
+        metavar=("A", "B"),
+        help="A から B までをまとめて計算し、処理速度と記録保持者を表示 (未指定時は対話モード)",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help="--range の計算エンジン (python: memo 付きの逐次計算, numpy: 一括計算)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="--range を分担するプロセス数 (既定: 1)",
+    )
+    parser.add_argument(
+        "--memo-limit",
+        type=int,
+        default=MEMO_LIMIT,
+        help=f"停止時間を memo に保存する値の上限 (既定: {MEMO_LIMIT})",
+    )
+    trajectories = parser.add_argument_group("軌道の出力と集計 (--range と併用)")
+    trajectories.add_argument("--export", help="軌道をこのファイルに書き出す")
+    trajectories.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="csv",
+        help="--export の形式 (csv: 1 行 1 軌道, binary: varint 列)",
+    )
+    trajectories.add_argument(
+        "--analyze",
+        action="store_true",
+        help="停止時間のヒストグラムと最大値の記録表を表示",
+    )
+    trajectories.add_argument(
+        "--histogram-bin", type=int, default=10, help="ヒストグラムの階級幅 (既定: 10)"
+    )
+    parser.add_argument("--show-path", action="store_true", help="対話モードで軌道も表示")
+    return parser.parse_args()
+
+
+def run_range(first: int, last: int, args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    if args.workers == 1:
+        # 1 プロセスならシャードに分けず、memo を範囲全体で共有する
+        if args.engine == "numpy":
+            batches = iter_stopping_times_numpy(first, last, args.memo_limit)
+            times = itertools.chain.from_iterable(batches)
+        else:
+            times = iter_stopping_times(first, last, args.memo_limit)
+    else:
+        times = iter_stopping_times_sharded(args.engine, first, last, args.workers, args.memo_limit)
+    records = record_holders(first, times)
+    elapsed = time.perf_counter() - start
+    count = last - first + 1
+    print(f"{first}..{last}: {count:,} 個を {elapsed:.2f} 秒で計算 ({count / elapsed:,.0f} 個/秒)")
+    print("記録保持者:")
+    for n, steps in records:
+        print(f"  {n}: {steps} 回")
+
+
+def run_trajectories(first: int, last: int, args: argparse.Namespace) -> None:
+    start = time.perf_counter()
+    if args.export:
+        if args.format == "binary":
+            file = open(args.export, "wb")
+            writer = TrajectoryBinaryWriter(file)
+        else:
+            file = open(args.export, "w", encoding="utf-8", newline="")
+            writer = TrajectoryCSVWriter(file)
+        with file:
+            summary = export_trajectories(first, last, writer).summary()
+        print(f"軌道を保存しました: {args.export}")
+    else:
+        summary = export_trajectories(first, last).summary()
+    elapsed = time.perf_counter() - start
+    count = summary["count"]
+    print(
+        f"{first}..{last}: {count:,} 本の軌道を {elapsed:.2f} 秒で処理 "
+        f"({count / elapsed:,.0f} 本/秒)"
+    )
+    print(f"平均停止時間: {summary['average_steps']:.2f} 回 / 最大: {summary['max_steps']} 回")
+    if not args.analyze:
+        return
+    print("停止時間のヒストグラム:")
+    width = max(1, args.histogram_bin)
+    bins = collections.Counter()
+    for steps, frequency in summary["histogram"].items():
+        bins[steps // width] += frequency
+    for index, frequency in sorted(bins.items()):
+        print(f"  {index * width:>5}-{index * width + width - 1:<5} {frequency:>12,}")
+    print("最大値の記録表:")
+    for n, peak, steps in summary["excursion_records"]:
+        print(f"  {n}: 最大値 {peak} ({steps} 回)")
+
+
+def interactive(show_path: bool = False) -> None:
+    while True:
+        try:
+            line = input("number: ").strip()
+        except EOFError:
+            break
+        if not line:
+            break
+        try:
+            steps = stopping_time(int(line))
+        except ValueError:
+            print("1 以上の整数を入力してください。")
+            continue
+        print(f"{line}は{steps}回で1になります。")
+        if show_path:
+            print(" -> ".join(map(str, trajectory(int(line)))))
+
+
+def main() -> None:
+    args = parse_args()
+    if args.engine == "numpy" and np is None:
+        raise SystemExit("numpy エンジンには NumPy が必要です: pip install numpy")
+    if args.workers < 1:
+        raise SystemExit("--workers は 1 以上を指定してください。")
+    if args.range:
+        first, last = args.range
+        if not 1 <= first <= last:
+            sys.exit("1 <= A <= B となるように指定してください。")
+        if args.export or args.analyze:
+            run_trajectories(first, last, args)
+        else:
+            run_range(first, last, args)
+    else:
+        interactive(args.show_path)
+
+
+if __name__ == "__main__":
+    main()
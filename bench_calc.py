@@ -0,0 +1,361 @@
+"""Benchmark for calc.py command throughput.
+
+``--suite`` replays the synthetic streams in SCENARIOS straight through
+``process_command``. It reports ops/s and tracemalloc allocation figures, and
+``--profile`` writes cProfile stats for the same replay.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import io
+import pstats
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from decimal import Decimal, localcontext
+from typing import Callable, Dict, List, Tuple
+
+import calc
+
+
+def synthetic_commands(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    commands = ["add", "subtract", "multiply", "divide", "+", "-", "*", "/"]
+    lines = []
+    for _ in range(count):
+        lines.append(f"{rng.choice(commands)} {rng.randint(1, 9)}")
+        if rng.random() < 0.01:
+            lines.append("clear")
+    return lines[:count]
+
+
+def mixed_commands(count: int, seed: int) -> List[str]:
+    """Every command family, including aliases, percent, sqrt and eval."""
+
+    rng = random.Random(seed)
+    templates = [
+        lambda: f"{rng.choice(['add', '+', 'p'])} {rng.randint(1, 99)}",
+        lambda: f"{rng.choice(['subtract', '-', 's'])} {rng.randint(1, 99)}",
+        lambda: f"{rng.choice(['multiply', '*', 'm'])} {rng.uniform(0.5, 2):.3f}",
+        lambda: f"{rng.choice(['divide', '/', 'd'])} {rng.randint(1, 9)}",
+        lambda: f"% {rng.randint(1, 200)}",
+        lambda: "^ 2",
+        lambda: "sqrt",
+        lambda: "eval (value + 3) * 2 / 7",
+    ]
+    lines = []
+    while len(lines) < count:
+        lines.append(rng.choice(templates)())
+        if rng.random() < 0.05:  # keeps ^ 2 from overflowing the context
+            lines.append("clear")
+    return lines[:count]
+
+
+def invalid_commands(count: int, seed: int) -> List[str]:
+    """Mostly rejected input, so the error paths are timed as well."""
+
+    rng = random.Random(seed)
+    templates = [
+        lambda: f"frobnicate {rng.randint(1, 9)}",
+        lambda: f"add {rng.choice(['x', '1..2', 'nan?', '--'])}",
+        lambda: rng.choice(["add", "divide", "power", "load", "eval"]),
+        lambda: "divide 0",
+        lambda: f"load {rng.randint(5, 50)}",
+        lambda: "load seven",
+        lambda: f"eval {rng.choice(['(1 + ', '2 ** ', 'memory[9]', 'foo(1)'])}",
+        lambda: f"add {rng.randint(1, 9)}",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
+
+
+def memory_commands(count: int, seed: int) -> List[str]:
+    """Sessions dominated by save/load, with memory growing throughout."""
+
+    rng = random.Random(seed)
+    lines: List[str] = []
+    saved = 0
+    while len(lines) < count:
+        roll = rng.random()
+        if roll < 0.4 or saved == 0:
+            lines.append(f"add {rng.randint(1, 9)}")
+            lines.append("save")
+            saved += 1
+        elif roll < 0.8:
+            lines.append(f"load {rng.randrange(saved)}")
+        else:
+            lines.append(f"eval memory[{rng.randrange(saved)}] + value")
+    return lines[:count]
+
+
+SCENARIOS: Dict[str, Callable[[int, int], List[str]]] = {
+    "mixed": mixed_commands,
+    "invalid": invalid_commands,
+    "memory": memory_commands,
+}
+
+
+def replay(lines: List[str]) -> calc.CalculatorState:
+    state = calc.CalculatorState()
+    process_command = calc.process_command
+    for line in lines:
+        process_command(state, line)
+    return state
+
+
+def run_suite(args: argparse.Namespace) -> None:
+    streams = {name: SCENARIOS[name](args.lines, args.seed) for name in args.scenarios}
+    # tracemalloc only sees live blocks: "retained" is what the replay keeps
+    # (memory, caches) and "peak" bounds the transient allocations.
+    print(f"{'scenario':<10} {'ops/s':>12} {'retained/op':>12} {'B/op':>8} {'peak KiB':>10}")
+    for name, lines in streams.items():
+        seconds = min(timed(replay, lines) for _ in range(args.repeat))
+
+        # Measured in a separate pass because tracing slows the replay down.
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        state = replay(lines)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        growth = after.compare_to(before, "filename")
+        blocks = sum(max(stat.count_diff, 0) for stat in growth)
+        size = sum(max(stat.size_diff, 0) for stat in growth)
+        del state
+
+        print(
+            f"{name:<10} {len(lines) / seconds:>12,.0f} {blocks / len(lines):>12.3f} "
+            f"{size / len(lines):>8.1f} {peak / 1024:>10,.1f}"
+        )
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for lines in streams.values():
+            replay(lines)
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"\ncProfile stats written to {args.profile}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile_top)
+
+
+def timed(func: Callable[[List[str]], object], lines: List[str]) -> float:
+    start = time.perf_counter()
+    func(lines)
+    return time.perf_counter() - start
+
+
+def interactive_loop(state: calc.CalculatorState, lines: List[str], out: io.StringIO) -> None:
+    # Mirrors main()'s interactive loop: prompt rendering plus print per line.
+    for raw in lines:
+        print(
+            f"{calc.pycolor.CYAN}{state.value}{calc.pycolor.END}\n"
+            f"{calc.pycolor.ACCENT}❯{calc.pycolor.END} ",
+            end="",
+            file=out,
+        )
+        should_continue, message = calc.process_command(state, raw)
+        if message:
+            print(message, file=out)
+        if not should_continue:
+            break
+
+
+async def open_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if address.startswith("unix:"):
+        return await asyncio.open_unix_connection(address[len("unix:") :])
+    host, _, port = address.rpartition(":")
+    return await asyncio.open_connection(host or "127.0.0.1", int(port))
+
+
+async def client_session(
+    address: str, requests: int, pipeline: int, latencies: List[float]
+) -> None:
+    commands = [b"add 3\n", b"multiply 2\n", b"subtract 1\n", b"divide 2\n"]
+    reader, writer = await open_connection(address)
+    sent = 0
+    while sent < requests:
+        batch = min(pipeline, requests - sent)
+        send_times = []
+        for offset in range(batch):
+            writer.write(commands[(sent + offset) % len(commands)])
+            send_times.append(time.perf_counter())
+        await writer.drain()
+        for started in send_times:
+            await reader.readline()
+            latencies.append(time.perf_counter() - started)
+        sent += batch
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load_test(
+    address: str, clients: int, requests: int, pipeline: int
+) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client_session(address, requests, pipeline, latencies) for _ in range(clients))
+    )
+    return time.perf_counter() - start, latencies
+
+
+def spawn_local_server() -> Tuple[str, subprocess.Popen]:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    address = f"127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, calc.__file__, "--serve", address], stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return address, process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("calc.py --serve did not start in time")
+
+
+def run_load_test(args: argparse.Namespace) -> None:
+    process = None
+    address = args.address
+    if address is None:
+        address, process = spawn_local_server()
+    try:
+        elapsed, latencies = asyncio.run(
+            load_test(address, args.clients, args.requests, args.pipeline)
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"   clients: {args.clients}  pipeline: {args.pipeline}")
+    print(f"  requests: {len(latencies):,} in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"   latency: p50 {cuts[49] * 1000:.3f}ms  p99 {cuts[98] * 1000:.3f}ms")
+
+
+def time_per_call(func: Callable[[], object], count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def run_math_bench(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    cases = [
+        ("power, fractional exponent", 12, lambda: Decimal(rng.uniform(0.1, 100)), Decimal("1.37")),
+        ("power, integral exponent", 28, lambda: Decimal(rng.uniform(0.1, 100)), Decimal(17)),
+    ]
+    for precision in args.sqrt_precisions:
+        cases.append(("sqrt", precision, lambda: Decimal(rng.randrange(2, 10**12)), None))
+
+    print(f"{'path':<28} {'prec':>6} {'Decimal':>12} {'calc':>12} {'speedup':>8}")
+    for name, precision, make_value, exponent in cases:
+        with localcontext() as context:
+            context.prec = precision
+            values = [+make_value() for _ in range(64)]
+            if exponent is None:
+                reference = lambda value: value.sqrt()
+                fast = calc.decimal_sqrt
+            else:
+                reference = lambda value: value**exponent
+                fast = lambda value: calc.decimal_power(value, exponent)
+            count = max(1, args.math_calls // max(1, precision // 28))
+            baseline = time_per_call(lambda: [reference(value) for value in values], count)
+            optimized = time_per_call(lambda: [fast(value) for value in values], count)
+        per_value = len(values)
+        print(
+            f"{name:<28} {precision:>6} {baseline / per_value * 1e6:>10.2f}us "
+            f"{optimized / per_value * 1e6:>10.2f}us {baseline / optimized:>7.2f}x"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark calc.py command throughput.")
+    parser.add_argument("-n", "--lines", type=int, default=200_000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument(
+        "--load-test",
+        action="store_true",
+        help="Load-test calc.py --serve instead of the in-process command loop",
+    )
+    parser.add_argument(
+        "--address",
+        help="HOST:PORT or unix:PATH of a running server (default: spawn a local one)",
+    )
+    parser.add_argument(
+        "--suite",
+        action="store_true",
+        help="Replay the synthetic scenarios through process_command and report ops/s and allocations",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=list(SCENARIOS),
+        help="Scenarios to run with --suite",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repeat count for --suite")
+    parser.add_argument("--profile", metavar="PATH", help="Write cProfile stats for --suite to PATH")
+    parser.add_argument("--profile-top", type=int, default=15, help="Profile rows to print")
+    parser.add_argument(
+        "--math",
+        action="store_true",
+        help="Compare the power/sqrt fast paths with plain Decimal operations",
+    )
+    parser.add_argument(
+        "--sqrt-precisions",
+        type=int,
+        nargs="+",
+        default=[28, 200, 1000, 10_000],
+        help="Precisions for the sqrt comparison",
+    )
+    parser.add_argument("--math-calls", type=int, default=200, help="Rounds per math case")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10_000, help="Requests per client")
+    parser.add_argument("--pipeline", type=int, default=32, help="Requests in flight per client")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.load_test:
+        run_load_test(args)
+        return
+    if args.math:
+        run_math_bench(args)
+        return
+    if args.suite:
+        run_suite(args)
+        return
+
+    lines = synthetic_commands(args.lines, args.seed)
+
+    start = time.perf_counter()
+    interactive_loop(calc.CalculatorState(), lines, io.StringIO())
+    interactive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calc.run_batch(calc.CalculatorState(), lines, io.StringIO())
+    batch = time.perf_counter() - start
+
+    print(f"interactive: {len(lines) / interactive:,.0f} lines/s")
+    print(f"      batch: {len(lines) / batch:,.0f} lines/s")
+    print(f"    speedup: {interactive / batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark for the Collatz.py stopping-time engines."""
+
+from __future__ import annotations
+
+import argparse
+import array
+import os
+import time
+from typing import Callable, Dict
+
+import Collatz
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scalar_loop(first: int, last: int) -> array.array:
+    return array.array("H", (Collatz.stopping_time(n) for n in range(first, last + 1)))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark Collatz.py stopping-time engines.")
+    parser.add_argument("-n", "--count", type=int, default=1_000_000, help="Sweep 1..N")
+    parser.add_argument(
+        "--scalar-count",
+        type=int,
+        default=100_000,
+        help="Sweep length for the memo-less scalar loop (it is much slower)",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repeat count")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    count = args.count
+    engines: Dict[str, Callable[[], object]] = {
+        "memo": lambda: array.array("H", Collatz.iter_stopping_times(1, count)),
+    }
+    if Collatz.np is not None:
+        engines["numpy"] = lambda: Collatz.stopping_times_numpy(1, count)
+    else:
+        print("numpy is not installed; skipping the numpy engine.")
+    if args.workers > 1:
+        for engine in list(engines):
+            name = "python" if engine == "memo" else engine
+            engines[f"{engine} x{args.workers}"] = lambda name=name: list(
+                Collatz.iter_stopping_times_sharded(name, 1, count, args.workers)
+            )
+
+    scalar = best_of(lambda: scalar_loop(1, args.scalar_count), 1) / args.scalar_count
+    print(f"{'scalar':>12}: {1 / scalar:>12,.0f} values/s  (1..{args.scalar_count:,})")
+    for name, func in engines.items():
+        seconds = best_of(func, args.repeat)
+        rate = count / seconds
+        print(f"{name:>12}: {rate:>12,.0f} values/s  speedup vs scalar {rate * scalar:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
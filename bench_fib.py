@@ -0,0 +1,150 @@
+"""Benchmark for fib.py against the previous recursive lru_cache version.
+
+``--output-bench`` instead times the arithmetic backends and the decimal
+conversion, and ``--mod-bench`` times modular queries for huge indices.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from functools import lru_cache
+from typing import Callable
+
+import fib
+
+
+@lru_cache(maxsize=10000000)
+def legacy_fib(seq):
+    # Verbatim copy of the recursive implementation fib.py used to ship.
+    a, b = 0, 1
+    if seq == 0:
+        return a
+    elif abs(seq) == 1:
+        result = b
+    else:
+        if abs(seq) % 2 == 0:
+            k = abs(seq) / 2
+            result = ((2 * legacy_fib(k - 1)) + legacy_fib(k)) * legacy_fib(k)
+        else:
+            k = (abs(seq) + 1) / 2
+            result = legacy_fib(k) * legacy_fib(k) + legacy_fib(k - 1) * legacy_fib(k - 1)
+
+    if seq > 0:
+        return result
+    else:
+        return result * (-1) ** (abs(seq) + 1)
+
+
+def best_of(func: Callable[[], object], repeat: int, reset: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        reset()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark fib.py fast doubling.")
+    parser.add_argument(
+        "-n",
+        type=int,
+        nargs="+",
+        default=[10**3, 10**5, 10**6],
+        help="Indices to time (10**7 and 10**8 take a while for the legacy version)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repeat count")
+    parser.add_argument(
+        "--output-bench",
+        action="store_true",
+        help="Time the arithmetic backends and decimal conversion instead",
+    )
+    parser.add_argument(
+        "--mod-bench",
+        action="store_true",
+        help="Time fib_mod and fib_mod_batch queries for indices up to 10**18",
+    )
+    parser.add_argument(
+        "--moduli",
+        type=int,
+        nargs="+",
+        default=[1000, 10**9 + 7, 2**61 - 1],
+        help="Moduli for --mod-bench",
+    )
+    parser.add_argument("--queries", type=int, default=100_000, help="Queries per modulus")
+    parser.add_argument("--skip-legacy", action="store_true", help="Time only the new version")
+    return parser.parse_args()
+
+
+def run_output_bench(args: argparse.Namespace) -> None:
+    backends = ["python"] + (["gmpy2"] if fib.gmpy2 is not None else [])
+    if fib.gmpy2 is None:
+        print("gmpy2 is not installed; skipping the gmpy2 backend.")
+    print(f"{'n':>12} {'backend':>8} {'fib':>10}")
+    for n in args.n:
+        for backend in backends:
+            seconds = best_of(lambda: fib.fib(n, backend), args.repeat, lambda: None)
+            print(f"{n:>12} {backend:>8} {seconds:>9.4f}s")
+
+    converters = {"str()": str, "decimal": fib.decimal_string}
+    if fib.gmpy2 is not None:
+        converters["gmpy2"] = fib.to_decimal
+    print(f"\n{'n':>12} " + " ".join(f"{name:>10}" for name in converters))
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    try:
+        for n in args.n:
+            value = fib.fib(n, "python")
+            timings = [
+                best_of(lambda: func(value), args.repeat, lambda: None)
+                for func in converters.values()
+            ]
+            print(f"{n:>12} " + " ".join(f"{seconds:>9.4f}s" for seconds in timings))
+    finally:
+        sys.set_int_max_str_digits(limit)
+
+
+def run_mod_bench(args: argparse.Namespace) -> None:
+    rng = random.Random(0)
+    indices = [rng.randrange(10**18) for _ in range(args.queries)]
+    print(f"{'modulus':>20} {'period':>12} {'fib_mod':>12} {'batch cold':>12} {'batch warm':>12}")
+    for modulus in args.moduli:
+        single = best_of(lambda: [fib.fib_mod(n, modulus) for n in indices], 1, lambda: None)
+
+        def reset() -> None:
+            fib.pisano_period.cache_clear()
+            fib._pisano_table.cache_clear()
+
+        cold = best_of(lambda: fib.fib_mod_batch(indices, modulus), 1, reset)
+        warm = best_of(lambda: fib.fib_mod_batch(indices, modulus), args.repeat, lambda: None)
+        print(
+            f"{modulus:>20} {fib.pisano_period(modulus):>12.4g} {single:>11.4f}s "
+            f"{cold:>11.4f}s {warm:>11.4f}s"
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    if args.output_bench:
+        run_output_bench(args)
+        return
+    if args.mod_bench:
+        run_mod_bench(args)
+        return
+    print(f"{'n':>12} {'legacy':>10} {'doubling':>10} {'speedup':>8}")
+    for n in args.n:
+        new = best_of(lambda: fib.fib(n, "python"), args.repeat, lambda: None)
+        if args.skip_legacy:
+            print(f"{n:>12} {'-':>10} {new:>9.4f}s {'-':>8}")
+            continue
+        old = best_of(lambda: legacy_fib(n), args.repeat, legacy_fib.cache_clear)
+        assert legacy_fib(n) == fib.fib(n, "python")
+        print(f"{n:>12} {old:>9.4f}s {new:>9.4f}s {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
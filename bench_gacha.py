@@ -0,0 +1,64 @@
+"""Benchmark for the gacha.py simulation engines."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+import gacha
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_python(probability: float, characters: int, trials: int, seed: int) -> List[int]:
+    return gacha.simulate_trials(probability, characters, trials, random.Random(seed))
+
+
+def bench_numpy(probability: float, characters: int, trials: int, seed: int) -> List[int]:
+    return gacha.simulate_trials_numpy(
+        probability, characters, trials, gacha.np.random.default_rng(seed)
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark gacha.py simulation engines.")
+    parser.add_argument("-p", "--probability", type=float, default=1.0, help="Success rate (%%)")
+    parser.add_argument("-c", "--characters", type=int, default=100)
+    parser.add_argument("-t", "--trials", type=int, default=1000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repeat count")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    probability = args.probability / 100
+    engines = {"python": bench_python}
+    if gacha.np is not None:
+        engines["numpy"] = bench_numpy
+    else:
+        print("numpy is not installed; skipping the numpy engine.")
+
+    timings = {}
+    for name, func in engines.items():
+        seconds = best_of(
+            lambda: func(probability, args.characters, args.trials, args.seed), args.repeat
+        )
+        timings[name] = seconds
+        print(f"{name:>8}: {seconds:.4f}s  {args.trials / seconds:,.0f} trials/s")
+
+    if "numpy" in timings:
+        print(f" speedup: {timings['python'] / timings['numpy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark for the qrcode.py adaptive decoder against the full-frame loop.
+
+Pass recorded clips to measure real footage. With no clips, a synthetic clip
+is generated instead: a QR code drifting over a noisy background, with static
+stretches, changing contents and some frames with no code. The full-frame
+pyzbar results serve as the reference for the missed-detection rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, List, Set
+
+import cv2
+import numpy as np
+
+import qrcode
+
+
+def synthetic_clip(frames: int, width: int, height: int, seed: int) -> List[Any]:
+    rng = np.random.default_rng(seed)
+    background = rng.integers(90, 166, size=(height, width), dtype=np.uint8)
+    encoder = cv2.QRCodeEncoder.create()
+    side = min(width, height) // 3
+    clip = []
+    x, y = width // 4, height // 4
+    for index in range(frames):
+        image = background.copy()
+        segment = index // 60
+        if segment % 4 != 3:  # every fourth second-long segment has no code
+            if index % 60 >= 30:  # the second half of each segment is static
+                x = min(width - side - 1, max(0, x + int(rng.integers(-6, 7))))
+                y = min(height - side - 1, max(0, y + int(rng.integers(-6, 7))))
+            code = encoder.encode(f"segment-{segment}")
+            code = cv2.resize(code, (side, side), interpolation=cv2.INTER_NEAREST)
+            image[y : y + side, x : x + side] = code
+        # Sensor noise keeps consecutive frames from being bit-identical.
+        noise = rng.integers(-2, 3, size=image.shape, dtype=np.int16)
+        image = np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        clip.append(cv2.cvtColor(image, cv2.COLOR_GRAY2BGR))
+    return clip
+
+
+def read_clip(path: str, limit: int) -> List[Any]:
+    cap = cv2.VideoCapture(path)
+    clip = []
+    while len(clip) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        clip.append(frame)
+    cap.release()
+    return clip
+
+
+def run(clip: List[Any], decode: Callable[[Any], list]) -> tuple[float, List[Set[str]]]:
+    found = []
+    start = time.perf_counter()
+    for frame in clip:
+        found.append({barcode.data.decode("utf-8") for barcode in decode(frame)})
+    return time.perf_counter() - start, found
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark qrcode.py decode strategies.")
+    parser.add_argument("clips", nargs="*", help="Recorded video files (default: synthetic clip)")
+    parser.add_argument("--frames", type=int, default=480, help="Frames per clip")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=qrcode.DOWNSCALE)
+    parser.add_argument("--diff-threshold", type=float, default=qrcode.DIFF_THRESHOLD)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    clips = {path: read_clip(path, args.frames) for path in args.clips}
+    if not clips:
+        clips["synthetic"] = synthetic_clip(args.frames, args.width, args.height, args.seed)
+
+    for name, clip in clips.items():
+        if not clip:
+            print(f"{name}: no frames could be read; skipping.")
+            continue
+        full_seconds, reference = run(clip, qrcode.decode)
+        decoder = qrcode.AdaptiveDecoder(scale=args.scale, diff_threshold=args.diff_threshold)
+        adaptive_seconds, found = run(clip, decoder.decode)
+
+        expected = sum(1 for codes in reference if codes)
+        missed = sum(1 for want, got in zip(reference, found) if want and not want <= got)
+        extra = sum(1 for want, got in zip(reference, found) if got - want)
+        print(f"{name}: {len(clip)} frames, {expected} with a code in the full-frame pass")
+        print(f"      full: {len(clip) / full_seconds:>8.1f} decodes/s")
+        print(
+            f"  adaptive: {len(clip) / adaptive_seconds:>8.1f} decodes/s  "
+            f"speedup {full_seconds / adaptive_seconds:.2f}x"
+        )
+        print(
+            f"    missed: {missed / expected if expected else 0:.2%} ({missed} frames), "
+            f"extra: {extra} frames"
+        )
+        print("    passes: " + ", ".join(f"{key}={value}" for key, value in decoder.passes.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,32 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import csv
+import itertools
+import json
+import math
+import operator
+import os
+import re
+import struct
+import sys
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from decimal import Decimal, InvalidOperation
-from typing import Iterable, List, Tuple
+from decimal import MAX_PREC, Decimal, InvalidOperation, getcontext
+from functools import lru_cache
+from typing import Awaitable, BinaryIO, Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # only needed for the vectorised --column float path
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: MemoryStore locks with msvcrt instead
+    fcntl = None
+    import msvcrt
 
 
 class pycolor:
@@ -37,6 +60,7 @@ COMMAND_ALIASES = {
     "power": "power",
     "%": "percent",
     "c": "clear",
+    "=": "eval",
 }
 
 COMMAND_LIST = {
@@ -50,6 +74,7 @@ COMMAND_LIST = {
     "save": "現在値をメモリに保存します。",
     "load": "メモリから値を読み込みます。",
     "clear": "現在値を0にします。 (c)",
+    "eval": "後ろに入力した式を計算して現在値にします。例: eval (3+4)^2/sqrt(memory[0]) (=)",
     "exit": "終了します。",
     "help": "このヘルプを表示します。 (--help)",
 }
@@ -60,10 +85,121 @@ HELP_MESSAGE = "Commands:\n" + "\n".join(
 )
 
 
+class MemoryStore:
+    """Append-only, crash-safe calculator memory kept on disk.
+
+    Values are appended to ``path`` as UTF-8 text lines and located through
+    ``path + ".idx"``, a table of fixed-size (offset, length) records, so slot
+    ``i`` is read with one seek and nothing is loaded at startup. Each save writes
+    and fsyncs the value before its index record; on open, index records that are
+    torn or point past the data are dropped together with any unindexed data.
+
+    Several sessions may share one store: recovery and every append hold an
+    exclusive lock on the index file, and appends take their offset and slot
+    from the current file sizes rather than from what this handle last saw.
+    """
+
+    RECORD = struct.Struct("<QI")
+
+    def __init__(self, path: str, sync: bool = True) -> None:
+        self.path = path
+        self.sync = sync
+        self.data = open(path, "a+b")
+        self.index = open(path + ".idx", "a+b")
+        with self._locked():
+            self._recover()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fileno = self.index.fileno()
+        if fcntl is not None:
+            fcntl.flock(fileno, fcntl.LOCK_EX)
+        else:
+            self.index.seek(0)
+            msvcrt.locking(fileno, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fileno, fcntl.LOCK_UN)
+            else:
+                self.index.seek(0)
+                msvcrt.locking(fileno, msvcrt.LK_UNLCK, 1)
+
+    def _recover(self) -> None:
+        record_size = self.RECORD.size
+        index_size = os.fstat(self.index.fileno()).st_size
+        data_size = os.fstat(self.data.fileno()).st_size
+        count = index_size // record_size
+        while count:
+            offset, length = self._record(count - 1)
+            if offset + length <= data_size:
+                break
+            count -= 1
+        end = 0
+        if count:
+            offset, length = self._record(count - 1)
+            end = offset + length
+        if count * record_size != index_size:
+            self.index.truncate(count * record_size)
+        if end != data_size:
+            self.data.truncate(end)
+        self.count = count
+
+    def _record(self, position: int) -> Tuple[int, int]:
+        self.index.seek(position * self.RECORD.size)
+        return self.RECORD.unpack(self.index.read(self.RECORD.size))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> Decimal:
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError("memory index out of range")
+        offset, length = self._record(position)
+        self.data.seek(offset)
+        return Decimal(self.data.read(length).decode("ascii").rstrip("\n"))
+
+    def __iter__(self) -> Iterator[Decimal]:
+        for position in range(self.count):
+            yield self[position]
+
+    def append(self, value: Decimal) -> None:
+        payload = f"{value}\n".encode("ascii")
+        with self._locked():
+            # Another session may have appended since this one last looked.
+            offset = os.fstat(self.data.fileno()).st_size
+            self.data.write(payload)
+            self._flush(self.data)
+            self.index.write(self.RECORD.pack(offset, len(payload)))
+            self._flush(self.index)
+            self.count = os.fstat(self.index.fileno()).st_size // self.RECORD.size
+
+    def _flush(self, file: BinaryIO) -> None:
+        file.flush()
+        if self.sync:
+            os.fsync(file.fileno())
+
+    def close(self) -> None:
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self) -> "MemoryStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
 @dataclass
 class CalculatorState:
     value: Decimal = Decimal("0")
-    memory: List[Decimal] = field(default_factory=list)
+    memory: List[Decimal] | MemoryStore = field(default_factory=list)
+
+
+CommandHandler = Callable[[CalculatorState, List[str]], Tuple[bool, str | None]]
 
 
 def safe_decimal(value: str) -> Tuple[Decimal | None, str | None]:
@@ -75,6 +211,88 @@ def safe_decimal(value: str) -> Tuple[Decimal | None, str | None]:
         return None, f'"{value}" is not a number.'
 
 
+FLOAT_SAFE_DIGITS = 15  # float reproduces this many significant digits exactly
+ISQRT_MIN_PRECISION = 100  # from here math.isqrt beats Decimal.sqrt
+_FLOAT_EPSILON = sys.float_info.epsilon
+
+
+def decimal_power(base: Decimal, exponent: Decimal) -> Decimal:
+    """``base ** exponent`` under the current context.
+
+    Integral exponents stay on ``Decimal.__pow__``, which already uses exact
+    exponentiation by squaring. For fractional exponents at FLOAT_SAFE_DIGITS or
+    less, ``math.pow`` is tried first. Its result is used only when the error
+    bound around it rounds to a single Decimal with a full coefficient, so the
+    answer matches the Decimal one digit for digit, exponent included.
+    """
+
+    context = getcontext()
+    if (
+        context.prec <= FLOAT_SAFE_DIGITS
+        and base.is_finite()
+        and exponent.is_finite()
+        and base > 0
+        and exponent != exponent.to_integral_value()
+    ):
+        x, y = float(base), float(exponent)
+        try:
+            result = math.pow(x, y)
+        except OverflowError:
+            result = math.inf
+        if 1e-300 < result < 1e300:
+            # float(base), float(exponent) and pow each add about one ulp, and the
+            # input errors are amplified by |y| and |y * ln(x)|.
+            error = (abs(y) * (1 + abs(math.log(x))) + 4) * _FLOAT_EPSILON
+            low = context.create_decimal_from_float(result * (1 - error))
+            high = context.create_decimal_from_float(result * (1 + error))
+            if low == high:
+                candidate = context.create_decimal_from_float(result)
+                # Inexact powers always carry prec digits. A shorter coefficient or a
+                # trailing zero may be an exact root, whose exponent Decimal picks.
+                coefficient = candidate.as_tuple().digits
+                if len(coefficient) == context.prec and coefficient[-1]:
+                    return candidate
+    return base**exponent
+
+
+def decimal_sqrt(value: Decimal) -> Decimal:
+    """``value.sqrt()`` with an integer square root path for high precision.
+
+    Gives the same digits and exponent as ``Decimal.sqrt``: exact roots are
+    reduced towards the ideal exponent, and inexact roots get a sticky digit
+    before the one final rounding.
+    """
+
+    precision = getcontext().prec
+    if precision < ISQRT_MIN_PRECISION or not value.is_finite() or value <= 0:
+        return value.sqrt()
+
+    _, digits, exponent = value.as_tuple()
+    coefficient = int("".join(map(str, digits)))
+    shift = max(0, 2 * (precision + 1) - len(digits))
+    if (exponent - shift) % 2:
+        shift += 1
+    scaled = coefficient * 10**shift
+    root = math.isqrt(scaled)
+    root_exponent = (exponent - shift) // 2
+    if root * root == scaled:
+        ideal_exponent = exponent // 2
+        while root_exponent < ideal_exponent and root % 10 == 0:
+            root //= 10
+            root_exponent += 1
+    else:
+        root = root * 10 + 1
+        root_exponent -= 1
+    return Decimal(root).scaleb(root_exponent)
+
+
+def precision_digits(value: str) -> int:
+    digits = int(value)
+    if not 1 <= digits <= MAX_PREC:
+        raise argparse.ArgumentTypeError(f"precision must be between 1 and {MAX_PREC}")
+    return digits
+
+
 def parse_cli_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Command-line calculator", add_help=False)
     parser.add_argument("--help", action="store_true", dest="show_help", help="Show command list")
@@ -89,6 +307,52 @@ def parse_cli_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         default=[],
         help="Initial memory values (space separated Decimal compatible)",
     )
+    parser.add_argument(
+        "--precision",
+        type=precision_digits,
+        help="Significant digits for Decimal results (default: 28)",
+    )
+    parser.add_argument(
+        "--memory-file",
+        help="Keep memory in this file across sessions (--memory values are appended to it)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read commands from stdin without prompts and print the final value",
+    )
+    parser.add_argument(
+        "--script",
+        help="Run commands from a file ('-' for stdin) in batch mode",
+    )
+    parser.add_argument(
+        "--column",
+        metavar="FILE",
+        help="Apply --pipeline to every number in FILE ('-' for stdin) and stream the results",
+    )
+    parser.add_argument(
+        "--pipeline",
+        default="",
+        help='Commands applied to each --column value, separated by ";" (e.g. "add 3; sqrt")',
+    )
+    parser.add_argument(
+        "--field",
+        help="Read --column as CSV and take this column (header name or 0-based index)",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Use float arithmetic for --column even when it cannot hold the Decimal precision",
+    )
+    parser.add_argument(
+        "--output",
+        help="Write --column results to this file instead of stdout",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="Serve one calculator session per connection on HOST:PORT or unix:PATH",
+    )
     return parser.parse_args(argv)
 
 
@@ -97,11 +361,18 @@ def initialize_state(args: argparse.Namespace) -> Tuple[CalculatorState | None,
     if error:
         return None, error
 
-    state = CalculatorState(value=value)
+    memory = []
     for item in args.memory:
         converted, memory_error = safe_decimal(item)
         if memory_error:
             return None, memory_error
+        memory.append(converted)
+
+    state = CalculatorState(value=value)
+    memory_file = getattr(args, "memory_file", None)
+    if memory_file:
+        state.memory = MemoryStore(memory_file)
+    for converted in memory:
         state.memory.append(converted)
 
     if args.show_help:
@@ -114,107 +385,322 @@ def _missing_value_message(command_name: str) -> str:
     return f"Missing value for {command_name}." + f"\n{HELP_MESSAGE}"
 
 
-def process_command(state: CalculatorState, input_line: str) -> Tuple[bool, str | None]:
-    parts = input_line.strip().split()
-    if not parts:
-        return True, HELP_MESSAGE
+NESTING_MESSAGE = "Expression is too deeply nested."
 
-    command = parts[0]
-    command = COMMAND_ALIASES.get(command, command)
 
-    if command in {"--help", "help"}:
-        return True, HELP_MESSAGE
+class ExpressionError(ValueError):
+    """Raised when an expression cannot be parsed or evaluated."""
 
-    if command in {"commands", "list"}:
-        return True, HELP_MESSAGE
 
-    if command == "exit":
-        return False, f"{pycolor.GREEN}Bye.{pycolor.END}"
+Evaluator = Callable[[CalculatorState], Decimal]
 
-    if command == "add":
-        if len(parts) < 2:
-            return True, _missing_value_message("add")
-        operand, error = safe_decimal(parts[1])
-        if error:
-            return True, error
-        state.value += operand
-        return True, None
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(?P<name>[A-Za-z_]\w*)|(?P<op>\S))"
+)
 
-    if command == "subtract":
-        if len(parts) < 2:
-            return True, _missing_value_message("subtract")
-        operand, error = safe_decimal(parts[1])
-        if error:
-            return True, error
-        state.value -= operand
-        return True, None
 
-    if command == "multiply":
-        if len(parts) < 2:
-            return True, _missing_value_message("multiply")
-        operand, error = safe_decimal(parts[1])
-        if error:
-            return True, error
-        state.value *= operand
-        return True, None
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
 
-    if command == "divide":
-        if len(parts) < 2:
-            return True, _missing_value_message("divide")
-        operand, error = safe_decimal(parts[1])
-        if error:
-            return True, error
-        if operand == 0:
-            return True, "Cannot divide by zero."
-        state.value /= operand
-        return True, None
 
-    if command == "power":
-        if len(parts) < 2:
-            return True, _missing_value_message("power")
-        operand, error = safe_decimal(parts[1])
-        if error:
-            return True, error
-        state.value = state.value ** operand
-        return True, None
+def _checked_sqrt(value: Decimal) -> Decimal:
+    if value < 0:
+        raise ExpressionError("Cannot take square root of a negative number.")
+    return decimal_sqrt(value)
+
+
+EXPRESSION_FUNCTIONS: Dict[str, Callable[[Decimal], Decimal]] = {
+    "sqrt": _checked_sqrt,
+    "abs": abs,
+}
+
+
+class _ExpressionParser:
+    """Recursive-descent parser that turns tokens into nested closures.
+
+    Grammar (``^`` is right associative and binds tighter than unary minus)::
+
+        expr  := term (("+" | "-") term)*
+        term  := unary (("*" | "/") unary)*
+        unary := ("+" | "-") unary | power
+        power := atom ("^" unary)?
+        atom  := NUMBER | "value" | "memory" "[" expr "]" | NAME "(" expr ")" | "(" expr ")"
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]]) -> None:
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self) -> Tuple[str, str] | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self, expected: str | None = None) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise ExpressionError("Unexpected end of expression.")
+        if expected is not None and token[1] != expected:
+            raise ExpressionError(f'Expected "{expected}" but found "{token[1]}".')
+        self.index += 1
+        return token
+
+    def parse(self) -> Evaluator:
+        evaluator = self.expr()
+        if self.peek() is not None:
+            raise ExpressionError(f'Unexpected "{self.peek()[1]}".')
+        return evaluator
+
+    def expr(self) -> Evaluator:
+        left = self.term()
+        while self.peek() in (("op", "+"), ("op", "-")):
+            symbol = self.take()[1]
+            right = self.term()
+            left = _binary(BINARY_OPERATORS[symbol], left, right)
+        return left
+
+    def term(self) -> Evaluator:
+        left = self.unary()
+        while self.peek() in (("op", "*"), ("op", "/")):
+            symbol = self.take()[1]
+            right = self.unary()
+            left = _binary(BINARY_OPERATORS[symbol], left, right)
+        return left
+
+    def unary(self) -> Evaluator:
+        if self.peek() == ("op", "-"):
+            self.take()
+            operand = self.unary()
+            return lambda state: -operand(state)
+        if self.peek() == ("op", "+"):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self) -> Evaluator:
+        base = self.atom()
+        if self.peek() == ("op", "^"):
+            self.take()
+            exponent = self.unary()
+            return _binary(decimal_power, base, exponent)
+        return base
+
+    def atom(self) -> Evaluator:
+        kind, text = self.take()
+        if kind == "number":
+            constant = Decimal(text)
+            return lambda state: constant
+        if kind == "op" and text == "(":
+            inner = self.expr()
+            self.take(")")
+            return inner
+        if kind == "name":
+            if text in {"value", "ans"}:
+                return lambda state: state.value
+            if text == "memory":
+                self.take("[")
+                index = self.expr()
+                self.take("]")
+                return lambda state: _memory_value(state, index(state))
+            function = EXPRESSION_FUNCTIONS.get(text)
+            if function is not None:
+                self.take("(")
+                argument = self.expr()
+                self.take(")")
+                return lambda state: function(argument(state))
+            raise ExpressionError(f'Unknown name "{text}".')
+        raise ExpressionError(f'Unexpected "{text}".')
+
+
+def _divide_values(left: Decimal, right: Decimal) -> Decimal:
+    if right == 0:
+        raise ExpressionError("Cannot divide by zero.")
+    return left / right
+
+
+BINARY_OPERATORS: Dict[str, Callable[[Decimal, Decimal], Decimal]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide_values,
+}
+
+
+def _binary(
+    function: Callable[[Decimal, Decimal], Decimal], left: Evaluator, right: Evaluator
+) -> Evaluator:
+    return lambda state: function(left(state), right(state))
+
+
+def _memory_value(state: CalculatorState, index: Decimal) -> Decimal:
+    if index != index.to_integral_value() or not 0 <= index < len(state.memory):
+        raise ExpressionError("Invalid memory index.")
+    return state.memory[int(index)]
+
+
+@lru_cache(maxsize=1024)
+def _compile_normalized(text: str) -> Evaluator:
+    return _ExpressionParser(_tokenize(text)).parse()
+
+
+def compile_expression(text: str) -> Evaluator:
+    """Compile an infix expression once; repeated expressions come from the cache."""
+
+    try:
+        return _compile_normalized(" ".join(text.split()))
+    except RecursionError:
+        raise ExpressionError(NESTING_MESSAGE) from None
+
+
+def evaluate_expression(state: CalculatorState, text: str) -> Decimal:
+    try:
+        return compile_expression(text)(state)
+    except (InvalidOperation, ArithmeticError) as error:
+        raise ExpressionError(f"Cannot evaluate expression: {error.__class__.__name__}.")
+    except RecursionError:
+        # Parsing can succeed just below the limit and evaluation still overflow it.
+        raise ExpressionError(NESTING_MESSAGE) from None
 
-    if command == "percent":
+
+def _eval(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    if len(parts) < 2:
+        return True, _missing_value_message("eval")
+    try:
+        state.value = evaluate_expression(state, " ".join(parts[1:]))
+    except ExpressionError as error:
+        return True, str(error)
+    return True, None
+
+
+def _show_help(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    return True, HELP_MESSAGE
+
+
+def _exit(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    return False, f"{pycolor.GREEN}Bye.{pycolor.END}"
+
+
+def _operand_command(
+    name: str, apply: Callable[[CalculatorState, Decimal], str | None]
+) -> CommandHandler:
+    """Wrap a command that takes one Decimal operand with the shared validation."""
+
+    def handler(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
         if len(parts) < 2:
-            return True, _missing_value_message("percent")
+            return True, _missing_value_message(name)
         operand, error = safe_decimal(parts[1])
         if error:
             return True, error
-        state.value *= operand / Decimal("100")
-        return True, None
+        return True, apply(state, operand)
 
-    if command == "sqrt":
-        if state.value < 0:
-            return True, "Cannot take square root of a negative number."
-        state.value = state.value.sqrt()
-        return True, None
+    return handler
 
-    if command == "save":
-        state.memory.append(state.value)
-        return True, f"{pycolor.BLUE}Saved {state.value}.{pycolor.END}"
 
-    if command == "load":
-        if len(parts) < 2:
-            return True, _missing_value_message("load")
-        try:
-            index = int(parts[1])
-        except ValueError:
-            return True, f'"{parts[1]}" is not a number.'
-        if index < 0 or index >= len(state.memory):
-            return True, "Invalid memory index."
-        state.value = state.memory[index]
-        return True, f"{pycolor.BLUE}Loaded {state.value}.{pycolor.END}"
-
-    if command == "clear":
-        state.value = Decimal("0")
-        return True, None
+def _add(state: CalculatorState, operand: Decimal) -> str | None:
+    state.value += operand
+    return None
+
+
+def _subtract(state: CalculatorState, operand: Decimal) -> str | None:
+    state.value -= operand
+    return None
+
+
+def _multiply(state: CalculatorState, operand: Decimal) -> str | None:
+    state.value *= operand
+    return None
+
+
+def _divide(state: CalculatorState, operand: Decimal) -> str | None:
+    if operand == 0:
+        return "Cannot divide by zero."
+    state.value /= operand
+    return None
+
+
+def _power(state: CalculatorState, operand: Decimal) -> str | None:
+    state.value = decimal_power(state.value, operand)
+    return None
+
+
+def _percent(state: CalculatorState, operand: Decimal) -> str | None:
+    state.value *= operand / Decimal("100")
+    return None
+
+
+def _sqrt(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    if state.value < 0:
+        return True, "Cannot take square root of a negative number."
+    state.value = decimal_sqrt(state.value)
+    return True, None
+
+
+def _save(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    state.memory.append(state.value)
+    return True, f"{pycolor.BLUE}Saved {state.value}.{pycolor.END}"
+
+
+def _load(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    if len(parts) < 2:
+        return True, _missing_value_message("load")
+    try:
+        index = int(parts[1])
+    except ValueError:
+        return True, f'"{parts[1]}" is not a number.'
+    if index < 0 or index >= len(state.memory):
+        return True, "Invalid memory index."
+    state.value = state.memory[index]
+    return True, f"{pycolor.BLUE}Loaded {state.value}.{pycolor.END}"
+
+
+def _clear(state: CalculatorState, parts: List[str]) -> Tuple[bool, str | None]:
+    state.value = Decimal("0")
+    return True, None
+
+
+COMMAND_HANDLERS: Dict[str, CommandHandler] = {
+    "--help": _show_help,
+    "help": _show_help,
+    "commands": _show_help,
+    "list": _show_help,
+    "exit": _exit,
+    "add": _operand_command("add", _add),
+    "subtract": _operand_command("subtract", _subtract),
+    "multiply": _operand_command("multiply", _multiply),
+    "divide": _operand_command("divide", _divide),
+    "power": _operand_command("power", _power),
+    "percent": _operand_command("percent", _percent),
+    "sqrt": _sqrt,
+    "save": _save,
+    "load": _load,
+    "clear": _clear,
+    "eval": _eval,
+}
+
+# Aliases are resolved once here so each line costs a single dict lookup.
+DISPATCH_TABLE: Dict[str, CommandHandler] = {
+    **{alias: COMMAND_HANDLERS[name] for alias, name in COMMAND_ALIASES.items()},
+    **COMMAND_HANDLERS,
+}
+
+
+def process_command(state: CalculatorState, input_line: str) -> Tuple[bool, str | None]:
+    parts = input_line.split()
+    if not parts:
+        return True, HELP_MESSAGE
+
+    handler = DISPATCH_TABLE.get(parts[0])
+    if handler is not None:
+        return handler(state, parts)
 
     if state.value == 0:
-        parsed, error = safe_decimal(command)
+        parsed, error = safe_decimal(parts[0])
         if error is None and parsed is not None:
             state.value = parsed
             return True, None
@@ -222,8 +708,286 @@ def process_command(state: CalculatorState, input_line: str) -> Tuple[bool, str
     return True, f"Error: command not found\n{HELP_MESSAGE}"
 
 
+def arithmetic_error_message(error: ArithmeticError) -> str:
+    """Message for a command whose arithmetic failed; the value is left unchanged."""
+
+    return f"Cannot compute result: {error.__class__.__name__}."
+
+
+def run_batch(state: CalculatorState, lines: Iterable[str], out: TextIO) -> int:
+    """Run commands without prompts; blank lines and ``#`` comments are skipped.
+
+    Returns the number of commands executed. Stops at ``exit``.
+    """
+
+    executed = 0
+    write = out.write
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped[0] == "#":
+            continue
+        executed += 1
+        try:
+            should_continue, message = process_command(state, stripped)
+        except ArithmeticError as error:
+            should_continue, message = True, arithmetic_error_message(error)
+        if message:
+            write(message)
+            write("\n")
+        if not should_continue:
+            break
+    return executed
+
+
+COLUMN_CHUNK_SIZE = 8192
+
+# Column pipelines only transform the value, so memory and eval commands are excluded.
+COLUMN_OPERATIONS = ("add", "subtract", "multiply", "divide", "power", "percent", "sqrt", "clear")
+
+PipelineStep = Tuple[str, Decimal | None]
+
+
+def compile_pipeline(text: str) -> List[PipelineStep]:
+    """Parse ``"add 3; percent 50; sqrt"`` into (operation, operand) steps.
+
+    ``percent`` is folded into ``multiply`` so the per-value work is a plain
+    arithmetic operation. Raises ValueError with a user-facing message.
+    """
+
+    steps: List[PipelineStep] = []
+    for raw in text.split(";"):
+        parts = raw.split()
+        if not parts:
+            continue
+        name = COMMAND_ALIASES.get(parts[0], parts[0])
+        if name not in COLUMN_OPERATIONS:
+            raise ValueError(f'"{parts[0]}" cannot be used in a column pipeline.')
+        if name in {"sqrt", "clear"}:
+            steps.append((name, None))
+            continue
+        if len(parts) < 2:
+            raise ValueError(f"Missing value for {name}.")
+        operand, error = safe_decimal(parts[1])
+        if error:
+            raise ValueError(error)
+        if name == "divide" and operand == 0:
+            raise ValueError("Cannot divide by zero.")
+        if name == "percent":
+            name, operand = "multiply", operand / Decimal("100")
+        steps.append((name, operand))
+    return steps
+
+
+_DECIMAL_STEPS: Dict[str, Callable[[Decimal, Decimal], Decimal]] = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "power": decimal_power,
+}
+
+_NAN = Decimal("NaN")
+
+
+def apply_pipeline_decimal(values: List[Decimal], steps: List[PipelineStep]) -> List[Decimal]:
+    """Apply the steps to a whole chunk, one operation at a time."""
+
+    for name, operand in steps:
+        if name == "clear":
+            values = [Decimal("0")] * len(values)
+        elif name == "sqrt":
+            values = [_NAN if value.is_nan() or value < 0 else decimal_sqrt(value) for value in values]
+        else:
+            function = _DECIMAL_STEPS[name]
+            result = []
+            for value in values:
+                try:
+                    result.append(function(value, operand))
+                except ArithmeticError:
+                    result.append(_NAN)
+            values = result
+    return values
+
+
+_FLOAT_STEPS: Dict[str, Callable] = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "power": lambda base, exponent: (np.power if np is not None else math.pow)(base, exponent),
+}
+
+
+def apply_pipeline_float(values: List[float], steps: List[PipelineStep]) -> List[float]:
+    """Float version of apply_pipeline_decimal, vectorised with NumPy when installed."""
+
+    if np is not None:
+        array = np.asarray(values, dtype=float)
+        with np.errstate(all="ignore"):
+            for name, operand in steps:
+                if name == "clear":
+                    array = np.zeros_like(array)
+                elif name == "sqrt":
+                    array = np.sqrt(array)
+                else:
+                    array = _FLOAT_STEPS[name](array, float(operand))
+        return array.tolist()
+
+    for name, operand in steps:
+        if name == "clear":
+            values = [0.0] * len(values)
+            continue
+        result = []
+        for value in values:
+            try:
+                if name == "sqrt":
+                    result.append(math.sqrt(value))
+                else:
+                    result.append(_FLOAT_STEPS[name](value, float(operand)))
+            except (ArithmeticError, ValueError):
+                result.append(math.nan)
+        values = result
+    return values
+
+
+def iter_column(lines: Iterable[str], field: str | None) -> Iterator[str]:
+    """Yield the raw text of each value: first token per line, or one CSV column."""
+
+    if field is None:
+        for line in lines:
+            stripped = line.strip()
+            if stripped and stripped[0] != "#":
+                yield stripped.split()[0]
+        return
+
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    if field.isdigit():
+        index = int(field)
+    elif field in header:
+        index = header.index(field)
+    else:
+        raise ValueError(f'Column "{field}" not found.')
+    for row in reader:
+        if index < len(row):
+            yield row[index].strip()
+
+
+def run_column(
+    raw_values: Iterable[str],
+    steps: List[PipelineStep],
+    out: TextIO,
+    use_float: bool,
+    chunk_size: int = COLUMN_CHUNK_SIZE,
+) -> Tuple[int, int]:
+    """Stream the pipeline over a column; returns (values written, unparsable values)."""
+
+    written = invalid = 0
+    iterator = iter(raw_values)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        if use_float:
+            numbers = []
+            for text in chunk:
+                try:
+                    numbers.append(float(text))
+                except ValueError:
+                    numbers.append(math.nan)
+                    invalid += 1
+            results = [repr(value) for value in apply_pipeline_float(numbers, steps)]
+        else:
+            decimals = []
+            for text in chunk:
+                value, error = safe_decimal(text)
+                if error:
+                    value = _NAN
+                    invalid += 1
+                decimals.append(value)
+            results = [str(value) for value in apply_pipeline_decimal(decimals, steps)]
+        out.write("\n".join(results))
+        out.write("\n")
+        written += len(results)
+    return written, invalid
+
+
+def column_uses_float(force_float: bool) -> bool:
+    return force_float or getcontext().prec <= FLOAT_SAFE_DIGITS
+
+
+_ANSI_PATTERN = re.compile(r"\033\[[0-9;]*m")
+
+
+def format_response(state: CalculatorState, should_continue: bool, message: str | None) -> bytes:
+    """Encode one server reply as a JSON line with ANSI colours stripped."""
+
+    payload = {
+        "value": str(state.value),
+        "message": _ANSI_PATTERN.sub("", message) if message else None,
+        "continue": should_continue,
+    }
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    make_state: Callable[[], CalculatorState],
+) -> None:
+    """Answer each request line with one JSON line, in order.
+
+    Clients may pipeline requests; replies are buffered and only awaited on when
+    the transport signals back-pressure.
+    """
+
+    state = make_state()
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                writer.write(format_response(state, False, "Line too long."))
+                break
+            if not line:
+                break
+            try:
+                should_continue, message = process_command(state, line.decode("utf-8", "replace"))
+            except ArithmeticError as error:
+                should_continue, message = True, arithmetic_error_message(error)
+            writer.write(format_response(state, should_continue, message))
+            await writer.drain()
+            if not should_continue:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    address: str, make_state: Callable[[], CalculatorState]
+) -> asyncio.AbstractServer:
+    def handler(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Awaitable[None]:
+        return handle_connection(reader, writer, make_state)
+
+    if address.startswith("unix:"):
+        return await asyncio.start_unix_server(handler, path=address[len("unix:") :])
+    host, _, port = address.rpartition(":")
+    return await asyncio.start_server(handler, host or "127.0.0.1", int(port))
+
+
+async def serve(address: str, make_state: Callable[[], CalculatorState]) -> None:
+    server = await start_server(address, make_state)
+    sockets = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"{pycolor.GREEN}Serving on {sockets}{pycolor.END}")
+    async with server:
+        await server.serve_forever()
+
+
 def main(argv: Iterable[str] | None = None) -> None:
     args = parse_cli_args(argv)
+    if args.precision:
+        getcontext().prec = args.precision
     state, init_message = initialize_state(args)
     if state is None:
         print(init_message)
@@ -232,6 +996,62 @@ def main(argv: Iterable[str] | None = None) -> None:
     if init_message:
         print(init_message)
 
+    try:
+        run(args, state)
+    finally:
+        if isinstance(state.memory, MemoryStore):
+            state.memory.close()
+
+
+def run(args: argparse.Namespace, state: CalculatorState) -> None:
+    if args.batch or args.script:
+        if args.script and args.script != "-":
+            with open(args.script, encoding="utf-8") as script:
+                run_batch(state, script, sys.stdout)
+        else:
+            run_batch(state, sys.stdin, sys.stdout)
+        print(state.value)
+        return
+
+    if args.column:
+        try:
+            steps = compile_pipeline(args.pipeline)
+        except ValueError as error:
+            print(error)
+            return
+        use_float = column_uses_float(args.fast)
+        source = sys.stdin if args.column == "-" else open(args.column, encoding="utf-8", newline="")
+        sink = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            _, invalid = run_column(iter_column(source, args.field), steps, sink, use_float)
+        except ValueError as error:
+            print(error)
+            return
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if sink is not sys.stdout:
+                sink.close()
+        if invalid:
+            print(f"{invalid} values were not numbers and were written as NaN.", file=sys.stderr)
+        return
+
+    if args.serve:
+        initial = state
+
+        def make_state() -> CalculatorState:
+            # A persistent store is shared by every session; plain memory is copied.
+            memory = initial.memory
+            if not isinstance(memory, MemoryStore):
+                memory = list(memory)
+            return CalculatorState(value=initial.value, memory=memory)
+
+        try:
+            asyncio.run(serve(args.serve, make_state))
+        except KeyboardInterrupt:
+            print(pycolor.RED + "\nA KeyBoardInterrupt occurred." + pycolor.END)
+        return
+
     while True:
         print(f"{pycolor.CYAN}{state.value}{pycolor.END}\n{pycolor.ACCENT}❯{pycolor.END} ", end="")
         try:
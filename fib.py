@@ -1,33 +1,517 @@
-from functools import lru_cache
+import argparse
+import decimal
+import math
+import operator
+import os
+import random
+import struct
 import sys
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    import gmpy2
+except ImportError:  # pragma: no cover - optional backend
+    gmpy2 = None
+
+BACKENDS = ("auto", "python", "gmpy2")
+DECIMAL_LEAF_BITS = 128  # below this, Decimal(int) is cheaper than splitting further
+STR_SAFE_BITS = 14_000  # str() stays under its default 4300-digit limit and is fast here
+PISANO_TABLE_LIMIT = 1 << 20  # periods up to this length are answered from a table
+FIB_CACHE_BYTES = 64 << 20  # default memory budget of a FibCache
+CHECKPOINT_MIN_INDEX = 1 << 16  # smaller pairs are cheaper to recompute than to read
+CHECKPOINT_LENGTH = struct.Struct("<Q")
+SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def integer_type(backend="auto"):
+    """Integer type for the arithmetic: gmpy2.mpz when available, else int."""
+
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend: {backend}")
+    if backend == "gmpy2" and gmpy2 is None:
+        raise ValueError("gmpy2 is not installed")
+    if backend == "python" or gmpy2 is None:
+        return int
+    return gmpy2.mpz
+
+
+class FibCache:
+    """Pairs (F(k), F(k+1)) kept in LRU order under a byte budget.
+
+    fib() stores the pair for every prefix k = n >> j it passes, so a later
+    index that shares a prefix with an earlier one resumes from there. With
+    ``directory``, pairs for k >= checkpoint_min_index are also written as
+    checkpoint files and read back on a miss, so later runs can use them.
+    """
 
-# Exceeds the limit対策
-sys.set_int_max_str_digits(0)
+    def __init__(self, max_bytes=FIB_CACHE_BYTES, directory=None, checkpoint_min_index=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.checkpoint_min_index = (
+            CHECKPOINT_MIN_INDEX if checkpoint_min_index is None else checkpoint_min_index
+        )
+        self.bytes = 0
+        self._pairs = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __contains__(self, index):
+        return index in self._pairs
+
+    def get(self, index):
+        pair = self._pairs.get(index)
+        if pair is not None:
+            self._pairs.move_to_end(index)
+            return pair
+        pair = self._load(index)
+        if pair is not None:
+            self._remember(index, pair)
+        return pair
+
+    def put(self, index, pair):
+        if index in self._pairs:
+            self._pairs.move_to_end(index)
+            return
+        self._remember(index, pair)
+        if self.directory and index >= self.checkpoint_min_index:
+            self._save(index, pair)
+
+    def _remember(self, index, pair):
+        size = sys.getsizeof(pair[0]) + sys.getsizeof(pair[1])
+        if size > self.max_bytes:
+            return
+        self._pairs[index] = pair
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._pairs.popitem(last=False)
+            self.bytes -= sys.getsizeof(evicted[0]) + sys.getsizeof(evicted[1])
+
+    def _path(self, index):
+        return os.path.join(self.directory, f"{index:x}.pair")
+
+    def _save(self, index, pair):
+        path = self._path(index)
+        if os.path.exists(path):
+            return
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            for value in pair:
+                value = int(value)
+                data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+                file.write(CHECKPOINT_LENGTH.pack(len(data)))
+                file.write(data)
+        os.replace(temporary, path)  # readers never see a half-written checkpoint
+
+    def _load(self, index):
+        if not self.directory or index < self.checkpoint_min_index:
+            return None
+        try:
+            with open(self._path(index), "rb") as file:
+                pair = []
+                for _ in range(2):
+                    (length,) = CHECKPOINT_LENGTH.unpack(file.read(CHECKPOINT_LENGTH.size))
+                    data = file.read(length)
+                    if len(data) != length:
+                        return None
+                    pair.append(int.from_bytes(data, "little"))
+        except (OSError, struct.error):
+            return None
+        return tuple(pair)
 
-# Decorator for reuse of previous results
-@lru_cache(maxsize=10000000)
 
 # n-th Fibonacci number
-def fib(seq):
-    a, b = 0, 1
-    if seq == 0:
-        return a
-    elif abs(seq) == 1:
-        result = b
+def fib(seq: int, backend: str = "auto", cache: FibCache | None = None) -> int:
+    n = abs(operator.index(seq))
+    if n < 2:
+        return n
+    # Fast doubling for O(log n): walk the bits of n after the top one, keeping
+    # (f, g) = (F(k), F(k-1)) for the prefix k read so far. Two squarings per
+    # bit are enough:
+    #   F(2k+1) = 4F(k)^2 - F(k-1)^2 + 2(-1)^k,  F(2k-1) = F(k)^2 + F(k-1)^2
+    number = integer_type(backend)
+    f, g = number(1), number(0)
+    odd = True
+    start = n.bit_length() - 2
+    if cache is not None:
+        # Resume from the longest prefix of n that is cached.
+        for shift in range(1, n.bit_length() - 1):
+            pair = cache.get(n >> shift)
+            if pair is not None:
+                f, g = number(pair[0]), number(pair[1] - pair[0])
+                odd = bool((n >> shift) & 1)
+                start = shift - 1
+                break
+    for shift in range(start, 0, -1):
+        f2 = f * f
+        g2 = g * g
+        upper = 4 * f2 - g2 + (-2 if odd else 2)
+        lower = f2 + g2
+        odd = bool((n >> shift) & 1)
+        if odd:
+            f, g = upper, upper - lower
+        else:
+            f, g = upper - lower, lower
+        if cache is not None:
+            cache.put(n >> shift, (f, f + g))
+
+    # The last bit needs only one product, the largest one.
+    if n & 1:
+        result = (2 * f - g) * (2 * f + g) + (-2 if odd else 2)
     else:
-	# Algorithm for O(log n).
-        if abs(seq) % 2 == 0:
-            k = abs(seq) / 2
-            result = ((2 * fib(k - 1)) + fib(k)) * fib(k)
+        result = f * (f + 2 * g)
+
+    # gmpy2.mpz stays internal; callers always get a plain int.
+    result = int(result)
+    # Processing when n is a negative number: F(-n) = (-1)^(n+1) F(n).
+    if seq < 0 and n % 2 == 0:
+        return -result
+    return result
+
+
+def fib_range(
+    first: int,
+    last: int,
+    backend: str = "auto",
+    modulus: int | None = None,
+    cache: FibCache | None = None,
+):
+    """Yield F(first), F(first + 1), ..., F(last), reduced mod modulus if given.
+
+    Fast doubling jumps to the start; after that each number costs one
+    addition. Only the current pair is kept, so memory does not grow with
+    the range.
+    """
+
+    if modulus is not None:
+        a, b = fib_mod(first, modulus), fib_mod(first + 1, modulus)
+        for _ in range(last - first + 1):
+            yield a
+            a, b = b, (a + b) % modulus
+        return
+
+    number = integer_type(backend)
+    a, b = number(fib(first, backend, cache)), number(fib(first + 1, backend, cache))
+    for _ in range(last - first + 1):
+        yield int(a)
+        a, b = b, a + b
+
+
+def _fib_pair_mod(n, modulus):
+    """(F(n) mod m, F(n+1) mod m) for n >= 0 by fast doubling on residues."""
+
+    a, b = 0, 1 % modulus
+    for shift in range(n.bit_length() - 1, -1, -1):
+        c = a * (2 * b - a) % modulus
+        d = (a * a + b * b) % modulus
+        if (n >> shift) & 1:
+            a, b = d, (c + d) % modulus
         else:
-            k = (abs(seq) + 1) / 2
-            result = fib(k) * fib(k) + fib(k - 1) * fib(k - 1)
+            a, b = c, d
+    return a, b
+
+
+def _check_modulus(modulus):
+    modulus = operator.index(modulus)
+    if modulus < 1:
+        raise ValueError("modulus must be a positive integer")
+    return modulus
+
+
+def fib_mod(seq: int, modulus: int) -> int:
+    """F(seq) mod modulus without building F(seq); O(log seq) residue steps."""
+
+    modulus = _check_modulus(modulus)
+    n = abs(operator.index(seq))
+    result = _fib_pair_mod(n, modulus)[0]
+    if seq < 0 and n % 2 == 0:
+        return -result % modulus
+    return result
+
+
+def is_probable_prime(n: int) -> bool:
+    """Miller-Rabin; deterministic for n < 3.3 * 10**24 with these bases."""
+
+    if n < 2:
+        return False
+    for prime in SMALL_PRIMES:
+        if n % prime == 0:
+            return n == prime
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for base in SMALL_PRIMES:
+        x = pow(base, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
 
-    if seq > 0:
-        return result
+def _pollard_brent(n: int) -> int:
+    """A non-trivial factor of the odd composite n."""
+
+    rng = random.Random(n)
+    while True:
+        y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                saved = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                saved = (saved * saved + c) % n
+                g = math.gcd(abs(x - saved), n)
+        if g != n:
+            return g
+
+
+def factorize(n: int) -> dict:
+    """Prime factorization {prime: exponent} of n >= 1."""
+
+    factors = {}
+    for prime in SMALL_PRIMES:
+        while n % prime == 0:
+            factors[prime] = factors.get(prime, 0) + 1
+            n //= prime
+    pending = [n] if n > 1 else []
+    while pending:
+        n = pending.pop()
+        if is_probable_prime(n):
+            factors[n] = factors.get(n, 0) + 1
+            continue
+        factor = _pollard_brent(n)
+        pending += [factor, n // factor]
+    return dict(sorted(factors.items()))
+
+
+def _is_period(length: int, modulus: int) -> bool:
+    return _fib_pair_mod(length, modulus) == (0, 1 % modulus)
+
+
+def _reduce_period(candidate: int, modulus: int) -> int:
+    # The exact period divides candidate: strip each prime while it stays a period.
+    for prime in factorize(candidate):
+        while candidate % prime == 0 and _is_period(candidate // prime, modulus):
+            candidate //= prime
+    return candidate
+
+
+def _prime_power_period(prime: int, exponent: int) -> int:
+    if prime == 2:
+        base = 3
+    elif prime == 5:
+        base = 20
+    elif prime % 5 in (1, 4):
+        base = _reduce_period(prime - 1, prime)
     else:
-	# Processing when n is a negative number.
-        return result * (-1) ** (abs(seq) + 1)
+        base = _reduce_period(2 * (prime + 1), prime)
+    # pi(p^k) divides pi(p) * p^(k-1); equality is Wall's open conjecture, so check.
+    return _reduce_period(base * prime ** (exponent - 1), prime**exponent)
+
+
+@lru_cache(maxsize=None)
+def pisano_period(modulus: int) -> int:
+    """Exact period of F(n) mod modulus, from the modulus' factorization."""
+
+    modulus = _check_modulus(modulus)
+    period = 1
+    for prime, exponent in factorize(modulus).items():
+        period = math.lcm(period, _prime_power_period(prime, exponent))
+    return period
+
+
+@lru_cache(maxsize=8)
+def _pisano_table(modulus: int):
+    period = pisano_period(modulus)
+    table = array("Q") if modulus <= 1 << 64 else []
+    a, b = 0, 1 % modulus
+    for _ in range(period):
+        table.append(a)
+        a, b = b, (a + b) % modulus
+    return table
+
+
+def fib_mod_batch(indices, modulus: int) -> list:
+    """F(n) mod modulus for every n in indices, sharing one Pisano period.
+
+    When the period is at most PISANO_TABLE_LIMIT, one full period is tabulated
+    (and cached) so each query is a lookup; otherwise each index is reduced
+    by the period before the doubling.
+    """
+
+    modulus = _check_modulus(modulus)
+    period = pisano_period(modulus)
+    if period <= PISANO_TABLE_LIMIT:
+        table = _pisano_table(modulus)
+        return [table[operator.index(seq) % period] for seq in indices]
+    # F(n) mod m only depends on n mod pi(m), for negative n as well.
+    return [_fib_pair_mod(operator.index(seq) % period, modulus)[0] for seq in indices]
+
+
+def to_decimal(value) -> str:
+    """Decimal string of a huge integer, without int's str() digit limit."""
+
+    if abs(value).bit_length() <= STR_SAFE_BITS:
+        return str(value)
+    if gmpy2 is not None:
+        return gmpy2.mpz(value).digits(10)
+    return decimal_string(value)
+
+
+def decimal_string(value) -> str:
+    """Pure-Python divide-and-conquer version of to_decimal.
+
+    The binary halves are converted recursively and recombined as
+    ``hi * 2**w + lo`` in the decimal module, whose big multiplication is much
+    faster than CPython's quadratic str().
+    """
+
+    with decimal.localcontext() as context:
+        context.prec = decimal.MAX_PREC
+        context.Emax = decimal.MAX_EMAX
+        context.Emin = decimal.MIN_EMIN
+        context.traps[decimal.Inexact] = True
+        powers = {}
+
+        def power_of_two(width):
+            power = powers.get(width)
+            if power is None:
+                if width <= DECIMAL_LEAF_BITS:
+                    power = decimal.Decimal(2) ** width
+                else:
+                    half = width >> 1
+                    power = power_of_two(half) * power_of_two(width - half)
+                powers[width] = power
+            return power
+
+        def convert(number, width):
+            if width <= DECIMAL_LEAF_BITS:
+                return decimal.Decimal(number)
+            half = width >> 1
+            high = number >> half
+            low = number - (high << half)
+            return convert(low, half) + convert(high, width - half) * power_of_two(half)
+
+        magnitude = abs(int(value))
+        digits = str(convert(magnitude, magnitude.bit_length()))
+    return "-" + digits if value < 0 else digits
+
+
+def digit_count(value) -> int:
+    """Number of decimal digits of value (ignoring the sign)."""
+
+    magnitude = abs(value)
+    if magnitude < 10:
+        return 1
+    # floor((bits - 1) * log10(2)) is the digit count minus one or minus two.
+    count = math.floor((magnitude.bit_length() - 1) * math.log10(2)) + 1
+    return count + 1 if magnitude >= 10**count else count
+
+
+def parse_cli_args(argv=None):
+    parser = argparse.ArgumentParser(description="Print the n-th Fibonacci number.")
+    parser.add_argument(
+        "n", type=int, nargs="*", default=[1000000], help="Indices (default: 1000000)"
+    )
+    parser.add_argument(
+        "--range",
+        type=int,
+        nargs=2,
+        metavar=("A", "B"),
+        help="Print F(A) through F(B), one per line, instead of F(n)",
+    )
+    parser.add_argument(
+        "--mod",
+        type=int,
+        metavar="M",
+        help="Print F(n) mod M; several indices share one cached Pisano period",
+    )
+    parser.add_argument(
+        "--pisano", action="store_true", help="Print the Pisano period of --mod M and exit"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="auto",
+        help="Big-integer arithmetic (auto uses gmpy2 when installed)",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--hex", action="store_true", help="Print in hexadecimal")
+    output.add_argument(
+        "--digits", action="store_true", help="Print only the number of decimal digits"
+    )
+    parser.add_argument(
+        "--cache-dir", help="Read and write (F(k), F(k+1)) checkpoints in this directory"
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=float,
+        default=FIB_CACHE_BYTES / (1 << 20),
+        help="Memory budget of the pair cache in MiB (default: %(default)g)",
+    )
+    parser.add_argument("-o", "--output", help="Write the result to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def format_result(value, args) -> str:
+    if args.hex:
+        return format(value, "#x")
+    if args.digits:
+        return str(digit_count(value))
+    return to_decimal(value)
+
+
+def main(argv=None) -> None:
+    args = parse_cli_args(argv)
+    try:
+        integer_type(args.backend)
+        if args.mod is not None:
+            _check_modulus(args.mod)
+        cache = FibCache(int(args.cache_mb * (1 << 20)), args.cache_dir)
+        if args.pisano:
+            if args.mod is None:
+                raise ValueError("--pisano needs --mod M")
+            values = iter([pisano_period(args.mod)])
+        elif args.range:
+            first, last = args.range
+            values = fib_range(first, last, args.backend, args.mod, cache)
+        elif args.mod is not None:
+            values = iter(fib_mod_batch(args.n, args.mod))
+        else:
+            values = (fib(seq, args.backend, cache) for seq in args.n)
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    except (ValueError, OSError) as error:
+        sys.exit(str(error))
+    try:
+        for value in values:
+            out.write(format_result(value, args))
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
 
 
-print(fib(1000000))
+if __name__ == "__main__":
+    main()
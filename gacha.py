@@ -1,10 +1,23 @@
 import argparse
+import array
+import bisect
 import collections
 import csv
+import itertools
 import json
+import math
 import random
+import sqlite3
 import statistics
-from typing import Dict, Iterable, List, Sequence
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # --engine numpy を使うときだけ必要
+    np = None
 
 
 class pycolor:
@@ -25,6 +38,17 @@ class pycolor:
 
 MAX_CHARACTERS = 1_000_000
 MAX_TRIALS = 1_000_000
+NUMPY_BLOCK_SIZE = 1 << 20  # numpy エンジンが 1 回に生成する乱数の上限
+ENGINES = ("python", "numpy")
+MAX_WORKERS = 256
+SHARD_TRIALS = 1_000  # 1 シャードの試行回数。ワーカー数に依存させないため固定
+MODES = ("simulate", "exact")
+PROGRESS_INTERVAL = 0.5  # 進捗表示の最短描画間隔 (秒)
+TRACE_LIMIT = 100_000  # 詳細ログの既定の最大行数
+TRACE_BATCH = 4096  # 詳細ログをまとめて書き出す行数
+EXACT_EPSILON = 1e-15  # 厳密計算でこれより小さい確率の裾は打ち切る
+MAX_EXACT_POINTS = 10_000_000
+EXACT_SPREAD = 40  # 裾まで含めた分布の幅の見積もり (標準偏差の何倍か)
 
 
 def probability_percentage(value: str) -> float:
@@ -46,6 +70,29 @@ def bounded_positive_int(name: str, limit: int):
     return parser
 
 
+def value_list(item_type):
+    def parser(value: str) -> list:
+        if ":" not in value:
+            return [item_type(item) for item in value.split(",")]
+        parts = value.split(":")
+        if len(parts) != 3:
+            raise argparse.ArgumentTypeError("範囲は start:stop:step で指定してください。")
+        try:
+            # 整数だけの範囲は float を経由せずに作り、大きな値も丸めずに渡す
+            start, stop, step = (int(part) for part in parts)
+        except ValueError:
+            start, stop, step = (float(part) for part in parts)
+        if step <= 0 or stop < start:
+            raise argparse.ArgumentTypeError("範囲は start <= stop, step > 0 で指定してください。")
+        if isinstance(start, int):
+            return [item_type(str(item)) for item in range(start, stop + 1, step)]
+        count = int((stop - start) / step + 1e-9) + 1
+        values = (round(start + index * step, 10) for index in range(count))
+        return [item_type(str(int(item)) if item.is_integer() else repr(item)) for item in values]
+
+    return parser
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="指定確率で成功するまでの試行回数を集計します。"
@@ -54,22 +101,22 @@ def parse_args() -> argparse.Namespace:
         "-p",
         "--probability",
         type=probability_percentage,
-        required=True,
-        help="成功確率 (0-100%%)",
+        default=None,
+        help="成功確率 (0-100%%)。--sweep-probability 未指定時は必須",
     )
     parser.add_argument(
         "-c",
         "--characters",
         type=bounded_positive_int("キャラ数", MAX_CHARACTERS),
-        required=True,
-        help=f"シミュレーションするキャラ数 (1-{MAX_CHARACTERS})",
+        default=None,
+        help=f"シミュレーションするキャラ数 (1-{MAX_CHARACTERS})。--sweep-characters 未指定時は必須",
     )
     parser.add_argument(
         "-t",
         "--trials",
         type=bounded_positive_int("試行回数", MAX_TRIALS),
-        required=True,
-        help=f"試行の繰り返し回数 (1-{MAX_TRIALS})",
+        default=None,
+        help=f"試行の繰り返し回数 (1-{MAX_TRIALS})。--mode simulate では必須",
     )
     parser.add_argument(
         "-s",
@@ -78,19 +125,103 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="乱数シード (未指定時はランダム)",
     )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help="シミュレーションエンジン (python: 1 回ずつ抽選, numpy: 幾何分布から一括生成)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=bounded_positive_int("ワーカー数", MAX_WORKERS),
+        default=None,
+        help=(
+            f"試行をシャードに分けて複数プロセスで実行します (1-{MAX_WORKERS})。"
+            "シード指定時の結果はワーカー数によらず同じですが、シャードごとに乱数系列を"
+            "分けるので --workers を省いた実行とは一致しません。掃引では格子点を並列に"
+            "計算するだけで、各点は --workers なしの単独実行と同じ結果になります。"
+        ),
+    )
+
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=MODES,
+        default="simulate",
+        help="simulate: モンテカルロで試行, exact: 負の二項分布から厳密に計算",
+    )
+    parser.add_argument(
+        "--percentiles",
+        type=float,
+        nargs="+",
+        default=[50.0, 90.0, 99.0],
+        help="--mode exact で表示するパーセンタイル (0-100)",
+    )
+    parser.add_argument(
+        "--tail",
+        type=int,
+        nargs="+",
+        default=[],
+        help="--mode exact で「N 回を超えて必要になる確率」を表示します",
+    )
+
+    sweep = parser.add_argument_group(
+        "sweep",
+        "start:stop:step (stop を含む) またはカンマ区切りで指定すると、"
+        "格子上の全組み合わせを 1 プロセスで実行して表にまとめます。",
+    )
+    sweep.add_argument(
+        "--sweep-probability",
+        type=value_list(probability_percentage),
+        help="掃引する成功確率 (%%)。例: 0.5:3:0.5",
+    )
+    sweep.add_argument(
+        "--sweep-characters",
+        type=value_list(bounded_positive_int("キャラ数", MAX_CHARACTERS)),
+        help="掃引するキャラ数。例: 1,5,10",
+    )
+    sweep.add_argument(
+        "--sweep-trials",
+        type=value_list(bounded_positive_int("試行回数", MAX_TRIALS)),
+        help="掃引する試行回数。例: 1000:5000:1000",
+    )
+    sweep.add_argument(
+        "--cache",
+        type=str,
+        help="掃引結果のキャッシュ (SQLite) のパス。--seed 指定時のみ使われます。",
+    )
 
     verbosity = parser.add_mutually_exclusive_group()
     verbosity.add_argument(
         "-q",
         "--quiet",
         action="store_true",
-        help="詳細ログを抑制します。",
+        help="進捗表示を抑制します。",
     )
     verbosity.add_argument(
         "-v",
         "--verbose",
         action="store_true",
-        help="詳細ログを有効にします。",
+        help="抽選ごとの詳細ログを有効にします (python エンジンのみ)。",
+    )
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        help="詳細ログの出力先 (未指定時は標準出力)。",
+    )
+    parser.add_argument(
+        "--trace-every",
+        type=bounded_positive_int("間引き間隔", 1_000_000_000),
+        default=1,
+        help="詳細ログを N 行に 1 行だけ残します。",
+    )
+    parser.add_argument(
+        "--trace-limit",
+        type=int,
+        default=TRACE_LIMIT,
+        help=f"詳細ログの最大行数 (既定: {TRACE_LIMIT})。",
     )
 
     parser.add_argument(
@@ -103,18 +234,144 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="結果を JSON 形式で保存するパス。",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--binary-output",
+        type=str,
+        help="record を int64 の生配列で保存するパス。ヘッダは <パス>.json に保存します。",
+    )
+    args = parser.parse_args()
+    args.sweep = any((args.sweep_probability, args.sweep_characters, args.sweep_trials))
+    if args.probability is None and not args.sweep_probability:
+        parser.error("-p/--probability が必要です。")
+    if args.characters is None and not args.sweep_characters:
+        parser.error("-c/--characters が必要です。")
+    if args.mode == "simulate" and args.trials is None and not args.sweep_trials:
+        parser.error("--mode simulate では -t/--trials が必要です。")
+    if args.mode == "simulate" and args.verbose and args.workers is not None:
+        parser.error("-v/--verbose は --workers と同時に使えません。")
+    if args.sweep and (args.mode != "simulate" or args.binary_output):
+        parser.error("掃引は --mode simulate でのみ使え、--binary-output には対応していません。")
+    if args.mode == "exact":
+        if args.probability == 0:
+            parser.error("確率 0 では成功しないため厳密計算できません。")
+        if args.binary_output:
+            parser.error("--binary-output は --mode simulate でのみ使えます。")
+        if any(not 0 < value <= 100 for value in args.percentiles):
+            parser.error("パーセンタイルは 0 より大きく 100 以下で指定してください。")
+    return args
+
+
+class TraceLog:
+    """抽選ごとの詳細ログを間引き・上限付きでまとめて書き出すシンク。
+
+    every 件に 1 件だけ残し、limit 件を超えた分は捨てて件数だけ最後に報告します。
+    端末への書き込みは batch 行ごとにまとめるので、詳細ログ有効時も抽選が詰まりません。
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        every: int = 1,
+        limit: int = TRACE_LIMIT,
+        batch: int = TRACE_BATCH,
+    ) -> None:
+        self.stream = stream
+        self.every = every
+        self.limit = limit
+        self.batch = batch
+        self.buffer: List[str] = []
+        self.seen = 0
+        self.written = 0
+        self.dropped = 0
+
+    def emit(self, line: str) -> None:
+        self.seen += 1
+        if self.every > 1 and self.seen % self.every:
+            return
+        if self.written >= self.limit:
+            self.dropped += 1
+            return
+        self.buffer.append(line)
+        self.written += 1
+        if len(self.buffer) >= self.batch:
+            self.flush()
+
+    def draw(self, value: float, success: bool) -> None:
+        color = pycolor.RED if success else pycolor.BLUE
+        self.emit(f"rand={value:.6f}, {color}{success}{pycolor.END}")
 
+    def character(self, index: int, attempts: int) -> None:
+        self.emit(f"character {index}: attempts={attempts}")
 
-def simulate_once(probability: float, rng: random.Random, verbose: bool) -> int:
+    def flush(self) -> None:
+        if self.buffer:
+            self.stream.write("\n".join(self.buffer) + "\n")
+            self.buffer.clear()
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.dropped:
+            self.buffer.append(f"... 上限 {self.limit} 行を超えた {self.dropped} 行を省略しました")
+        self.flush()
+
+
+class ProgressReporter:
+    """interval 秒に 1 回だけ描画する進捗表示 (試行/秒, 抽選/秒, 残り時間)。"""
+
+    def __init__(
+        self, total: int, interval: float = PROGRESS_INTERVAL, stream: TextIO = sys.stderr
+    ) -> None:
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.trials = 0
+        self.draws = 0
+        self.start = time.perf_counter()
+        self.last_render = self.start
+
+    def update(self, attempts: int) -> None:
+        self.trials += 1
+        self.draws += attempts
+        now = time.perf_counter()
+        if now - self.last_render >= self.interval:
+            self.render(now)
+
+    def render(self, now: float) -> None:
+        self.last_render = now
+        elapsed = max(now - self.start, 1e-9)
+        trial_rate = self.trials / elapsed
+        eta = (self.total - self.trials) / trial_rate if trial_rate else float("inf")
+        end = "\r" if self.stream.isatty() else "\n"
+        self.stream.write(
+            f"trial {self.trials}/{self.total}"
+            f"  {trial_rate:,.0f} trials/s  {self.draws / elapsed:,.0f} draws/s"
+            f"  ETA {eta:.1f}s{end}"
+        )
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.render(time.perf_counter())
+        if self.stream.isatty():
+            self.stream.write("\n")
+
+
+def track_progress(record: Iterable[int], reporter: ProgressReporter) -> Iterator[int]:
+    for attempts in record:
+        reporter.update(attempts)
+        yield attempts
+    reporter.close()
+
+
+def simulate_once(
+    probability: float, rng: random.Random, trace: TraceLog | None = None
+) -> int:
     count = 0
     while True:
         value = rng.random()
         success = value < probability
         count += 1
-        if verbose:
-            color = pycolor.RED if success else pycolor.BLUE
-            print(f"rand={value:.6f}, {color}{success}{pycolor.END}")
+        if trace is not None:
+            trace.draw(value, success)
         if success:
             break
     return count
@@ -124,32 +381,109 @@ def simulate_characters(
     probability: float,
     characters: int,
     rng: random.Random,
-    verbose: bool,
+    trace: TraceLog | None = None,
 ) -> int:
     attempts: List[int] = []
     for index in range(characters):
-        attempt_count = simulate_once(probability, rng, verbose)
+        attempt_count = simulate_once(probability, rng, trace)
         attempts.append(attempt_count)
-        if verbose:
-            print(f"character {index + 1}: attempts={attempt_count}")
+        if trace is not None:
+            trace.character(index + 1, attempt_count)
     return sum(attempts)
 
 
+def iter_trials(
+    probability: float,
+    characters: int,
+    trials: int,
+    rng: random.Random,
+    trace: TraceLog | None = None,
+) -> Iterator[int]:
+    for _ in range(trials):
+        yield simulate_characters(probability, characters, rng, trace)
+
+
 def simulate_trials(
     probability: float,
     characters: int,
     trials: int,
     rng: random.Random,
-    quiet: bool,
-    verbose: bool,
+    trace: TraceLog | None = None,
+) -> List[int]:
+    return list(iter_trials(probability, characters, trials, rng, trace))
+
+
+def iter_trials_numpy(
+    probability: float,
+    characters: int,
+    trials: int,
+    rng: "np.random.Generator",
+) -> Iterator[int]:
+    """成功までの試行回数を幾何分布から直接まとめて生成します。"""
+
+    rows = max(1, NUMPY_BLOCK_SIZE // characters)
+    for start in range(0, trials, rows):
+        stop = min(start + rows, trials)
+        draws = rng.geometric(probability, size=(stop - start, characters))
+        yield from draws.sum(axis=1).tolist()
+
+
+def simulate_trials_numpy(
+    probability: float,
+    characters: int,
+    trials: int,
+    rng: "np.random.Generator",
 ) -> List[int]:
-    record: List[int] = []
-    for trial_index in range(trials):
-        total_attempts = simulate_characters(probability, characters, rng, verbose)
-        record.append(total_attempts)
-        if not quiet:
-            print(f"trial {trial_index + 1}/{trials}: total_attempts={total_attempts}")
-    return record
+    return list(iter_trials_numpy(probability, characters, trials, rng))
+
+
+def shard_seed(root_seed: int, index: int) -> int:
+    # 文字列シードは SHA-512 で展開されるので、シャードごとに独立した系列になる
+    return random.Random(f"{root_seed}:{index}").getrandbits(64)
+
+
+def run_shard(task: Tuple[str, float, int, int, int, int]) -> List[int]:
+    engine, probability, characters, trials, root_seed, index = task
+    seed = shard_seed(root_seed, index)
+    if engine == "numpy":
+        return simulate_trials_numpy(probability, characters, trials, np.random.default_rng(seed))
+    return simulate_trials(probability, characters, trials, random.Random(seed))
+
+
+def iter_trials_sharded(
+    engine: str,
+    probability: float,
+    characters: int,
+    trials: int,
+    seed: int | None,
+    workers: int,
+) -> Iterator[int]:
+    """SHARD_TRIALS 件ずつのシャードに分けて実行し、シャード順に返します。"""
+
+    root_seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+    tasks = [
+        (engine, probability, characters, min(SHARD_TRIALS, trials - start), root_seed, index)
+        for index, start in enumerate(range(0, trials, SHARD_TRIALS))
+    ]
+
+    if workers == 1:
+        for shard in map(run_shard, tasks):
+            yield from shard
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard in executor.map(run_shard, tasks):
+                yield from shard
+
+
+def simulate_trials_sharded(
+    engine: str,
+    probability: float,
+    characters: int,
+    trials: int,
+    seed: int | None,
+    workers: int,
+) -> List[int]:
+    return list(iter_trials_sharded(engine, probability, characters, trials, seed, workers))
 
 
 def summarize(record: Sequence[int]) -> Dict[str, object]:
@@ -167,28 +501,334 @@ def summarize(record: Sequence[int]) -> Dict[str, object]:
     }
 
 
+class StreamingSummary:
+    """summarize と同じ集計を、記録を保持せず 1 パスで行います。"""
+
+    def __init__(self) -> None:
+        self.trials = 0
+        self.total_attempts = 0
+        self.total_squares = 0
+        self.max_attempts = 0
+        self.min_attempts = 0
+        self.histogram: collections.Counter = collections.Counter()
+
+    def add(self, attempts: int) -> None:
+        if self.trials == 0 or attempts > self.max_attempts:
+            self.max_attempts = attempts
+        if self.trials == 0 or attempts < self.min_attempts:
+            self.min_attempts = attempts
+        self.trials += 1
+        self.total_attempts += attempts
+        self.total_squares += attempts * attempts
+        self.histogram[attempts] += 1
+
+    def update(self, record: Iterable[int]) -> None:
+        for attempts in record:
+            self.add(attempts)
+
+    def merge(self, other: "StreamingSummary") -> None:
+        if other.trials == 0:
+            return
+        if self.trials == 0:
+            self.max_attempts = other.max_attempts
+            self.min_attempts = other.min_attempts
+        else:
+            self.max_attempts = max(self.max_attempts, other.max_attempts)
+            self.min_attempts = min(self.min_attempts, other.min_attempts)
+        self.trials += other.trials
+        self.total_attempts += other.total_attempts
+        self.total_squares += other.total_squares
+        self.histogram.update(other.histogram)
+
+    def summary(self) -> Dict[str, object]:
+        trials = self.trials
+        average = self.total_attempts / trials if trials else 0
+        variance: float = 0.0
+        if trials > 1:
+            # 整数のまま計算して statistics.pvariance と同じ値にする
+            numerator = trials * self.total_squares - self.total_attempts**2
+            denominator = trials * trials
+            if numerator % denominator:
+                variance = numerator / denominator
+            else:
+                variance = numerator // denominator
+        return {
+            "trials": trials,
+            "total_attempts": self.total_attempts,
+            "average_attempts": average,
+            "variance": variance,
+            "max_attempts": self.max_attempts,
+            "min_attempts": self.min_attempts,
+            "histogram": dict(sorted(self.histogram.items())),
+        }
+
+
+def exact_distribution(probability: float, characters: int) -> Tuple[List[int], List[float]]:
+    """キャラ数 k 体を引くまでの総試行回数 T の確率質量を返します。
+
+    T は負の二項分布 P(T = t) = C(t-1, k-1) p^k (1-p)^(t-k) (t >= k) に従うので、
+    最頻値から左右へ漸化式 P(t+1) / P(t) = t (1-p) / (t-k+1) で広げ、
+    EXACT_EPSILON 未満の裾は打ち切ります。
+    """
+
+    if not 0 < probability <= 1:
+        raise ValueError("probability は 0 より大きく 1 以下で指定してください。")
+    if probability == 1:
+        return [characters], [1.0]
+
+    failure = 1 - probability
+    if math.sqrt(characters * failure) / probability * EXACT_SPREAD > MAX_EXACT_POINTS:
+        # 配列を作り始める前に、幅が上限を超えそうなものは断る
+        raise ValueError("分布の幅が大きすぎるため厳密計算できません。")
+    mode = int((characters - 1) / probability) + 1
+    log_peak = (
+        math.lgamma(mode)
+        - math.lgamma(characters)
+        - math.lgamma(mode - characters + 1)
+        + characters * math.log(probability)
+        + (mode - characters) * math.log1p(-probability)
+    )
+    peak = math.exp(log_peak)
+
+    right: List[float] = []
+    t, mass = mode, peak
+    while mass >= EXACT_EPSILON or t <= mode:
+        right.append(mass)
+        mass *= t * failure / (t - characters + 1)
+        t += 1
+        if len(right) > MAX_EXACT_POINTS:
+            raise ValueError("分布の幅が大きすぎるため厳密計算できません。")
+
+    left: List[float] = []
+    t, mass = mode, peak
+    while t > characters:
+        mass *= (t - characters) / ((t - 1) * failure)
+        t -= 1
+        if mass < EXACT_EPSILON:
+            break
+        left.append(mass)
+        if len(left) > MAX_EXACT_POINTS:
+            raise ValueError("分布の幅が大きすぎるため厳密計算できません。")
+
+    start = mode - len(left)
+    return list(range(start, start + len(left) + len(right))), left[::-1] + right
+
+
+def exact_summary(
+    probability: float,
+    characters: int,
+    percentiles: Sequence[float] = (50.0, 90.0, 99.0),
+    tails: Sequence[int] = (),
+    histogram: bool = True,
+) -> Dict[str, object]:
+    attempts, masses = exact_distribution(probability, characters)
+    cumulative = list(itertools.accumulate(masses))
+
+    percentile_table: Dict[float, int] = {}
+    for percentile in percentiles:
+        index = bisect.bisect_left(cumulative, percentile / 100)
+        percentile_table[percentile] = attempts[min(index, len(attempts) - 1)]
+
+    tail_table: Dict[int, float] = {}
+    for limit in tails:
+        # 1 - CDF ではなく右側の質量を直接足して桁落ちを避ける
+        index = bisect.bisect_right(attempts, limit)
+        tail_table[limit] = math.fsum(masses[index:]) if index else 1.0
+
+    summary: Dict[str, object] = {
+        **exact_moments(probability, characters),
+        "mode_attempts": attempts[masses.index(max(masses))],
+        "percentiles": percentile_table,
+        "tail_probabilities": tail_table,
+    }
+    if histogram:
+        summary["histogram"] = dict(zip(attempts, masses))
+    return summary
+
+
+def exact_moments(probability: float, characters: int) -> Dict[str, object]:
+    """平均・分散・最小値の閉形式。分布を展開しないので幅に関係なく求まります。"""
+
+    return {
+        "average_attempts": characters / probability,
+        "variance": characters * (1 - probability) / probability**2,
+        "min_attempts": characters,
+    }
+
+
+def run_exact(args: argparse.Namespace, probability: float) -> None:
+    moments = exact_moments(probability, args.characters)
+    print("---- exact ----")
+    print(f"average_attempts: {moments['average_attempts']:.4f}")
+    print(f"variance: {moments['variance']:.4f}")
+    print(f"min_attempts: {moments['min_attempts']}")
+    try:
+        summary = exact_summary(
+            probability,
+            args.characters,
+            args.percentiles,
+            args.tail,
+            histogram=bool(args.verbose or args.json_output or args.csv_output),
+        )
+    except ValueError as error:
+        raise SystemExit(f"{error}分布全体が必要なら --mode simulate を使ってください。")
+    print(f"mode_attempts: {summary['mode_attempts']}")
+    for percentile, attempts in summary["percentiles"].items():
+        print(f"percentile {percentile:g}%: {attempts}")
+    for limit, tail in summary["tail_probabilities"].items():
+        print(f"P(attempts > {limit}): {tail:.6g}")
+    if args.verbose:
+        print(f"histogram: {summary['histogram']}")
+
+    parameters = build_parameters(args.probability, args.characters, args.trials, args.seed)
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as file:
+            json.dump(
+                {"parameters": parameters, "exact": summary}, file, ensure_ascii=False, indent=2
+            )
+        print(f"JSON を保存しました: {args.json_output}")
+    if args.csv_output:
+        with open(args.csv_output, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["attempts", "probability"])
+            writer.writerows(summary["histogram"].items())
+        print(f"CSV を保存しました: {args.csv_output}")
+
+
+CSV_FIELDNAMES = ["trial_index", "attempts", "characters", "probability_percent", "seed"]
+WRITE_CHUNK_SIZE = 65_536  # 書き出し時に 1 度にまとめる試行数
+
+
+def iter_chunks(record: Iterable[int], size: int) -> Iterator[List[int]]:
+    iterator = iter(record)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def build_parameters(
+    probability_percentage: float,
+    characters: int,
+    trials: int,
+    seed: int | None,
+) -> Dict[str, object]:
+    return {
+        "probability_percent": probability_percentage,
+        "characters": characters,
+        "trials": trials,
+        "seed": seed,
+    }
+
+
+class JSONRecordWriter:
+    """record をチャンクごとに書き出し、summary は close 時に追記します。"""
+
+    def __init__(self, path: str, parameters: Dict[str, object]) -> None:
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write('{\n  "parameters": ')
+        self.file.write(json.dumps(parameters, ensure_ascii=False))
+        self.file.write(',\n  "record": [')
+        self.empty = True
+
+    def write(self, chunk: Sequence[int]) -> None:
+        if not chunk:
+            return
+        if not self.empty:
+            self.file.write(", ")
+        self.file.write(", ".join(map(str, chunk)))
+        self.empty = False
+
+    def close(self, summary: Dict[str, object]) -> None:
+        self.file.write('],\n  "summary": ')
+        self.file.write(json.dumps(summary, ensure_ascii=False))
+        self.file.write("\n}\n")
+        self.file.close()
+        print(f"JSON を保存しました: {self.path}")
+
+
+class CSVRecordWriter:
+    def __init__(self, path: str, parameters: Dict[str, object]) -> None:
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(CSV_FIELDNAMES)
+        self.constants = (
+            parameters["characters"],
+            parameters["probability_percent"],
+            parameters["seed"],
+        )
+        self.count = 0
+
+    def write(self, chunk: Sequence[int]) -> None:
+        self.writer.writerows(
+            (index, attempts, *self.constants)
+            for index, attempts in enumerate(chunk, start=self.count + 1)
+        )
+        self.count += len(chunk)
+
+    def close(self, summary: Dict[str, object]) -> None:
+        self.file.close()
+        print(f"CSV を保存しました: {self.path}")
+
+
+class BinaryRecordWriter:
+    """record を int64 (リトルエンディアン) の生配列で書き出し、<path>.json にヘッダを置きます。
+
+    numpy からは np.fromfile(path, dtype="<i8") で読み込めます。
+    """
+
+    def __init__(self, path: str, parameters: Dict[str, object]) -> None:
+        self.path = path
+        self.parameters = parameters
+        self.file = open(path, "wb")
+        self.count = 0
+
+    def write(self, chunk: Sequence[int]) -> None:
+        data = array.array("q", chunk)
+        if sys.byteorder == "big":
+            data.byteswap()
+        data.tofile(self.file)
+        self.count += len(chunk)
+
+    def close(self, summary: Dict[str, object]) -> None:
+        self.file.close()
+        header = {
+            "format": "int64-le",
+            "count": self.count,
+            "parameters": self.parameters,
+            "summary": summary,
+        }
+        with open(self.path + ".json", "w", encoding="utf-8") as file:
+            json.dump(header, file, ensure_ascii=False, indent=2)
+        print(f"バイナリを保存しました: {self.path}")
+
+
+def load_binary_record(path: str) -> Tuple[Dict[str, object], array.array]:
+    with open(path + ".json", encoding="utf-8") as file:
+        header = json.load(file)
+    record = array.array("q")
+    with open(path, "rb") as file:
+        record.fromfile(file, header["count"])
+    if sys.byteorder == "big":
+        record.byteswap()
+    return header, record
+
+
 def save_json(
     path: str,
-    record: Sequence[int],
+    record: Iterable[int],
     summary: Dict[str, object],
     probability_percentage: float,
     characters: int,
     trials: int,
     seed: int | None,
 ) -> None:
-    payload = {
-        "parameters": {
-            "probability_percent": probability_percentage,
-            "characters": characters,
-            "trials": trials,
-            "seed": seed,
-        },
-        "record": list(record),
-        "summary": summary,
-    }
-    with open(path, "w", encoding="utf-8") as file:
-        json.dump(payload, file, ensure_ascii=False, indent=2)
-    print(f"JSON を保存しました: {path}")
+    writer = JSONRecordWriter(
+        path, build_parameters(probability_percentage, characters, trials, seed)
+    )
+    for chunk in iter_chunks(record, WRITE_CHUNK_SIZE):
+        writer.write(chunk)
+    writer.close(summary)
 
 
 def save_csv(
@@ -198,40 +838,253 @@ def save_csv(
     characters: int,
     seed: int | None,
 ) -> None:
-    fieldnames = ["trial_index", "attempts", "characters", "probability_percent", "seed"]
-    with open(path, "w", encoding="utf-8", newline="") as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        for index, attempts in enumerate(record, start=1):
-            writer.writerow(
-                {
-                    "trial_index": index,
-                    "attempts": attempts,
-                    "characters": characters,
-                    "probability_percent": probability_percentage,
-                    "seed": seed,
-                }
+    parameters = {
+        "probability_percent": probability_percentage,
+        "characters": characters,
+        "seed": seed,
+    }
+    writer = CSVRecordWriter(path, parameters)
+    for chunk in iter_chunks(record, WRITE_CHUNK_SIZE):
+        writer.write(chunk)
+    writer.close({})
+
+
+def open_writers(args: argparse.Namespace) -> List[object]:
+    parameters = build_parameters(args.probability, args.characters, args.trials, args.seed)
+    writers: List[object] = []
+    if args.json_output:
+        writers.append(JSONRecordWriter(args.json_output, parameters))
+    if args.csv_output:
+        writers.append(CSVRecordWriter(args.csv_output, parameters))
+    if args.binary_output:
+        writers.append(BinaryRecordWriter(args.binary_output, parameters))
+    return writers
+
+
+class SweepCache:
+    """(確率, キャラ数, 試行回数, シード, エンジン) ごとの summary を SQLite に保存します。"""
+
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " probability_percent REAL, characters INTEGER, trials INTEGER,"
+            " seed TEXT, engine TEXT, summary TEXT,"
+            " PRIMARY KEY (probability_percent, characters, trials, seed, engine))"
+        )
+
+    def get(self, key: Tuple[float, int, int, int, str]) -> Dict[str, object] | None:
+        probability_percent, characters, trials, seed, engine = key
+        row = self.connection.execute(
+            "SELECT summary FROM results WHERE probability_percent = ? AND characters = ?"
+            " AND trials = ? AND seed = ? AND engine = ?",
+            (probability_percent, characters, trials, str(seed), engine),
+        ).fetchone()
+        if row is None:
+            return None
+        summary = json.loads(row[0])
+        summary["histogram"] = {int(key): count for key, count in summary["histogram"].items()}
+        return summary
+
+    def put(self, key: Tuple[float, int, int, int, str], summary: Dict[str, object]) -> None:
+        probability_percent, characters, trials, seed, engine = key
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (probability_percent, characters, trials, str(seed), engine, json.dumps(summary)),
             )
-    print(f"CSV を保存しました: {path}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+SWEEP_COLUMNS = [
+    "probability_percent",
+    "characters",
+    "trials",
+    "average_attempts",
+    "variance",
+    "min_attempts",
+    "max_attempts",
+    "cached",
+]
+
+
+def run_point(task: Tuple[str, float, int, int, int | None]) -> Dict[str, object]:
+    engine, probability_percent, characters, trials, seed = task
+    probability = probability_percent / 100
+    if engine == "numpy":
+        record = iter_trials_numpy(probability, characters, trials, np.random.default_rng(seed))
+    else:
+        record = iter_trials(probability, characters, trials, random.Random(seed))
+    accumulator = StreamingSummary()
+    accumulator.update(record)
+    return accumulator.summary()
+
+
+def sweep(
+    points: Sequence[Tuple[float, int, int]],
+    engine: str,
+    seed: int | None,
+    workers: int | None,
+    cache: SweepCache | None = None,
+) -> List[Dict[str, object]]:
+    """格子点ごとに --workers なしの単独実行と同じ結果を求め、キャッシュ済みの点は再計算しません。
+
+    workers は格子点を並列に計算するプロセス数で、各点の乱数系列には影響しません。
+    """
+
+    summaries: Dict[Tuple[float, int, int], Dict[str, object]] = {}
+    cached = set()
+    if cache is not None and seed is not None:
+        for point in points:
+            summary = cache.get((*point, seed, engine))
+            if summary is not None:
+                summaries[point] = summary
+                cached.add(point)
+
+    pending = [point for point in dict.fromkeys(points) if point not in summaries]
+    tasks = [(engine, *point, seed) for point in pending]
+
+    def collect(computed: Iterable[Dict[str, object]]) -> None:
+        # 計算できた点から順にキャッシュし、中断しても途中まで再利用できるようにする
+        for point, summary in zip(pending, computed):
+            summaries[point] = summary
+            if cache is not None and seed is not None:
+                cache.put((*point, seed, engine), summary)
+
+    if workers is None or workers == 1:
+        collect(map(run_point, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            collect(executor.map(run_point, tasks))
+
+    rows = []
+    for point in points:
+        summary = summaries[point]
+        row = dict(zip(SWEEP_COLUMNS[:3], point))
+        row.update({column: summary[column] for column in SWEEP_COLUMNS[3:7]})
+        row["cached"] = point in cached
+        rows.append(row)
+    return rows
+
+
+def run_sweep(args: argparse.Namespace) -> None:
+    points = list(
+        itertools.product(
+            args.sweep_probability or [args.probability],
+            args.sweep_characters or [args.characters],
+            args.sweep_trials or [args.trials],
+        )
+    )
+    cache = None
+    if args.cache:
+        if args.seed is None:
+            print("シード未指定のため、キャッシュは使いません。")
+        else:
+            cache = SweepCache(args.cache)
+    try:
+        rows = sweep(points, args.engine, args.seed, args.workers, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print("---- sweep ----")
+    print(
+        f"{'probability%':>12} {'characters':>10} {'trials':>8} {'average':>12}"
+        f" {'variance':>14} {'min':>8} {'max':>8} cached"
+    )
+    for row in rows:
+        print(
+            f"{row['probability_percent']:>12g} {row['characters']:>10} {row['trials']:>8}"
+            f" {row['average_attempts']:>12.4f} {row['variance']:>14.4f}"
+            f" {row['min_attempts']:>8} {row['max_attempts']:>8} {row['cached']}"
+        )
+
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as file:
+            json.dump(rows, file, ensure_ascii=False, indent=2)
+        print(f"JSON を保存しました: {args.json_output}")
+    if args.csv_output:
+        with open(args.csv_output, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=SWEEP_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"CSV を保存しました: {args.csv_output}")
+
+
+def iter_record(
+    args: argparse.Namespace, probability: float, trace: TraceLog | None = None
+) -> Iterator[int]:
+    if args.workers is not None:
+        return iter_trials_sharded(
+            engine=args.engine,
+            probability=probability,
+            characters=args.characters,
+            trials=args.trials,
+            seed=args.seed,
+            workers=args.workers,
+        )
+    if args.engine == "numpy":
+        return iter_trials_numpy(
+            probability=probability,
+            characters=args.characters,
+            trials=args.trials,
+            rng=np.random.default_rng(args.seed),
+        )
+    return iter_trials(
+        probability=probability,
+        characters=args.characters,
+        trials=args.trials,
+        rng=random.Random(args.seed),
+        trace=trace,
+    )
 
 
 def main() -> None:
     args = parse_args()
+
+    if args.engine == "numpy" and np is None:
+        raise SystemExit("numpy エンジンには NumPy が必要です: pip install numpy")
+
+    if args.sweep:
+        run_sweep(args)
+        return
+
     probability = args.probability / 100
 
-    rng = random.Random(args.seed)
+    if args.mode == "exact":
+        run_exact(args, probability)
+        return
+
     if args.seed is not None and not args.quiet:
         print(f"乱数シードを設定しました: {args.seed}")
 
-    record = simulate_trials(
-        probability=probability,
-        characters=args.characters,
-        trials=args.trials,
-        rng=rng,
-        quiet=args.quiet,
-        verbose=args.verbose,
-    )
-    summary = summarize(record)
+    trace = None
+    trace_file = None
+    if args.verbose:
+        if args.trace_file:
+            trace_file = open(args.trace_file, "w", encoding="utf-8")
+        trace = TraceLog(trace_file or sys.stdout, every=args.trace_every, limit=args.trace_limit)
+
+    record = iter_record(args, probability, trace)
+    if not args.quiet:
+        record = track_progress(record, ProgressReporter(args.trials))
+
+    # 記録は保持せず、チャンクごとに集計とファイル出力へ流す
+    writers = open_writers(args)
+    accumulator = StreamingSummary()
+    try:
+        for chunk in iter_chunks(record, WRITE_CHUNK_SIZE):
+            accumulator.update(chunk)
+            for writer in writers:
+                writer.write(chunk)
+    finally:
+        if trace is not None:
+            trace.close()
+        if trace_file is not None:
+            trace_file.close()
+    summary = accumulator.summary()
 
     print("---- summary ----")
     print(f"trials: {summary['trials']}")
@@ -242,25 +1095,8 @@ def main() -> None:
     print(f"min_attempts: {summary['min_attempts']}")
     print(f"histogram: {summary['histogram']}")
 
-    if args.json_output:
-        save_json(
-            args.json_output,
-            record,
-            summary,
-            probability_percentage=args.probability,
-            characters=args.characters,
-            trials=args.trials,
-            seed=args.seed,
-        )
-
-    if args.csv_output:
-        save_csv(
-            args.csv_output,
-            record,
-            probability_percentage=args.probability,
-            characters=args.characters,
-            seed=args.seed,
-        )
+    for writer in writers:
+        writer.close(summary)
 
 
 if __name__ == "__main__":
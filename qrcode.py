@@ -1,12 +1,147 @@
 import argparse
+import glob
+import itertools
+import json
 import logging
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Generic, Iterable, Iterator, TextIO, TypeVar
 
 import cv2
+from pyzbar.locations import Point, Rect
 from pyzbar.pyzbar import decode
 
+T = TypeVar("T")
+
+STATS_WINDOW = 120  # latency samples kept per stage for the rolling statistics
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".m4v", ".webm", ".mpg", ".mpeg"}
+CHUNK_FRAMES = 256  # video frames (or images) per batch task
+DECODERS = ("adaptive", "full")
+DOWNSCALE = 0.5  # first-pass scale of the adaptive decoder
+ROI_MARGIN = 0.5  # ROI grows the last rect by this fraction of its size on every side
+DIFF_SIZE = 64  # side of the thumbnail used for the frame-difference check
+DIFF_THRESHOLD = 8.0  # largest thumbnail pixel change (0-255) still treated as "unchanged"
+MAX_SKIPS = 15  # consecutive skipped frames before a decode is forced anyway
+
+
+@dataclass
+class Frame:
+    index: int
+    captured_at: float
+    image: Any
+
+
+@dataclass
+class Detection:
+    rect: tuple[int, int, int, int]
+    data: str
+
+
+@dataclass
+class DecodeResult:
+    frame_index: int
+    captured_at: float
+    decoded_at: float
+    detections: list[Detection] = field(default_factory=list)
+
+
+class LatestSlot(Generic[T]):
+    """Single-item handoff where a newer item replaces one nobody has taken yet.
+
+    Producers never block, so a slow consumer only ever sees the freshest item
+    and ``dropped`` counts the ones it skipped.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._item: T | None = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: T) -> None:
+        with self._condition:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._condition.notify()
+
+    def get(self, timeout: float | None = None) -> T | None:
+        """Take the pending item, waiting up to ``timeout``; None when closed or timed out."""
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._item is not None or self._closed, timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class LatestResult:
+    """Most recent decode result by frame index; late results from older frames are ignored."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._result: DecodeResult | None = None
+
+    def publish(self, result: DecodeResult) -> bool:
+        with self._lock:
+            if self._result is not None and result.frame_index < self._result.frame_index:
+                return False
+            self._result = result
+            return True
+
+    def current(self) -> DecodeResult | None:
+        with self._lock:
+            return self._result
+
+
+class StageStats:
+    """Thread-safe throughput and latency counters for one pipeline stage."""
+
+    def __init__(self, name: str, window: int = STATS_WINDOW) -> None:
+        self.name = name
+        self.window = window
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._count = 0
+        self._latencies: list[float] = []
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._latencies.append(latency)
+            if len(self._latencies) > self.window:
+                del self._latencies[: len(self._latencies) - self.window]
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            latencies = sorted(self._latencies)
+            count = self._count
+        if not latencies:
+            return {"fps": 0.0, "latency_ms": 0.0, "p95_ms": 0.0, "count": count}
+        return {
+            "fps": count / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": 1000 * sum(latencies) / len(latencies),
+            "p95_ms": 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "count": count,
+        }
+
+    def describe(self) -> str:
+        stats = self.snapshot()
+        return (
+            f"{self.name}: {stats['fps']:.1f} fps, latency {stats['latency_ms']:.1f} ms "
+            f"(p95 {stats['p95_ms']:.1f} ms)"
+        )
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="QR code reader using OpenCV and pyzbar.")
@@ -29,6 +164,50 @@ def parse_args() -> argparse.Namespace:
         type=Path,
         help="Optional file path to save decode results in addition to stdout logging.",
     )
+    batch = parser.add_argument_group(
+        "batch mode", "Decode files instead of a camera, without opening a window."
+    )
+    batch.add_argument(
+        "--input",
+        nargs="+",
+        help="Video/image files, directories (searched recursively) or glob patterns.",
+    )
+    batch.add_argument(
+        "--output",
+        type=Path,
+        help="JSON Lines file for batch results (default: stdout).",
+    )
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Decode processes for batch mode (default: CPU count).",
+    )
+    batch.add_argument(
+        "--chunk-frames",
+        type=int,
+        default=CHUNK_FRAMES,
+        help=f"Frames or images per batch task (default: {CHUNK_FRAMES}).",
+    )
+    parser.add_argument(
+        "--decoder",
+        choices=DECODERS,
+        default="full",
+        help="full: pyzbar on every full frame; adaptive: frame skipping, ROI and "
+        "downscaled passes first (default: full).",
+    )
+    parser.add_argument(
+        "--decode-workers",
+        type=int,
+        default=2,
+        help="Number of decode threads (default: 2).",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between per-stage FPS/latency log lines; 0 disables them (default: 5).",
+    )
     return parser.parse_args()
 
 
@@ -40,10 +219,346 @@ def setup_logging(log_file: Path | None) -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", handlers=handlers)
 
 
+def _map_barcode(barcode: Any, scale: float, dx: int, dy: int) -> Any:
+    """Move a pyzbar result from a scaled/cropped image back to frame coordinates."""
+
+    left, top, width, height = barcode.rect
+    rect = Rect(
+        round(left / scale) + dx,
+        round(top / scale) + dy,
+        round(width / scale),
+        round(height / scale),
+    )
+    polygon = [Point(round(x / scale) + dx, round(y / scale) + dy) for x, y in barcode.polygon]
+    return barcode._replace(rect=rect, polygon=polygon)
+
+
+class AdaptiveDecoder:
+    """pyzbar decode with cheaper passes tried first.
+
+    Frames are converted to grayscale. A frame whose DIFF_SIZE thumbnail has no
+    pixel changed by diff_threshold or more since the last decoded frame reuses
+    the previous result; the maximum rather than the mean keeps a small code that
+    moves or changes from being averaged away. Comparing against the last decoded
+    frame, not the previous one, lets slow drift add up, and max_skips bounds how
+    long a result can be reused regardless. Otherwise the
+    decoder tries, in order, the region around the last detected rect, a
+    downscaled frame and finally the full frame. ``passes`` counts which step
+    produced each result.
+    """
+
+    def __init__(
+        self,
+        scale: float = DOWNSCALE,
+        roi_margin: float = ROI_MARGIN,
+        diff_threshold: float = DIFF_THRESHOLD,
+        max_skips: int = MAX_SKIPS,
+    ) -> None:
+        self.scale = scale
+        self.roi_margin = roi_margin
+        self.diff_threshold = diff_threshold
+        self.max_skips = max_skips
+        self.passes = {"skip": 0, "roi": 0, "downscale": 0, "full": 0, "miss": 0}
+        self._thumbnail: Any = None  # thumbnail of the last frame actually decoded
+        self._skipped = 0
+        self._last: list[Any] = []
+
+    def decode(self, image: Any) -> list[Any]:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        thumbnail = cv2.resize(gray, (DIFF_SIZE, DIFF_SIZE), interpolation=cv2.INTER_AREA)
+        if (
+            self._thumbnail is not None
+            and self._skipped < self.max_skips
+            and cv2.absdiff(thumbnail, self._thumbnail).max() < self.diff_threshold
+        ):
+            self._skipped += 1
+            self.passes["skip"] += 1
+            return self._last
+        self._thumbnail = thumbnail
+        self._skipped = 0
+
+        for name, attempt in (
+            ("roi", self._decode_roi),
+            ("downscale", self._decode_downscaled),
+            ("full", decode),
+        ):
+            barcodes = attempt(gray)
+            if barcodes:
+                self.passes[name] += 1
+                self._last = barcodes
+                return barcodes
+        self.passes["miss"] += 1
+        self._last = []
+        return []
+
+    def _decode_roi(self, gray: Any) -> list[Any]:
+        if not self._last:
+            return []
+        height, width = gray.shape[:2]
+        left = min(barcode.rect.left for barcode in self._last)
+        top = min(barcode.rect.top for barcode in self._last)
+        right = max(barcode.rect.left + barcode.rect.width for barcode in self._last)
+        bottom = max(barcode.rect.top + barcode.rect.height for barcode in self._last)
+        margin_x = int((right - left) * self.roi_margin)
+        margin_y = int((bottom - top) * self.roi_margin)
+        x0, y0 = max(0, left - margin_x), max(0, top - margin_y)
+        x1, y1 = min(width, right + margin_x), min(height, bottom + margin_y)
+        if x1 - x0 >= width and y1 - y0 >= height:
+            return []  # the ROI is the whole frame; leave it to the later passes
+        return [_map_barcode(barcode, 1.0, x0, y0) for barcode in decode(gray[y0:y1, x0:x1])]
+
+    def _decode_downscaled(self, gray: Any) -> list[Any]:
+        if self.scale >= 1:
+            return []
+        small = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return [_map_barcode(barcode, self.scale, 0, 0) for barcode in decode(small)]
+
+
+def decode_frame(frame: Frame, decoder: AdaptiveDecoder | None = None) -> DecodeResult:
+    barcodes = decoder.decode(frame.image) if decoder else decode(frame.image)
+    detections = [
+        Detection(tuple(barcode.rect), barcode.data.decode("utf-8")) for barcode in barcodes
+    ]
+    return DecodeResult(frame.index, frame.captured_at, time.perf_counter(), detections)
+
+
+def draw_overlays(image: Any, detections: list[Detection]) -> Any:
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    for detection in detections:
+        x, y, w, h = detection.rect
+        cv2.rectangle(image, (x, y), (x + w, y + h), (0, 0, 255), 2)
+        image = cv2.putText(
+            image, detection.data, (x, y - 10), font, 0.5, (0, 0, 255), 2, cv2.LINE_AA
+        )
+    return image
+
+
+def capture_loop(
+    cap: Any,
+    slots: list[LatestSlot[Frame]],
+    stats: StageStats,
+    stop: threading.Event,
+) -> None:
+    index = 0
+    while not stop.is_set() and cap.isOpened():
+        started = time.perf_counter()
+        ret, image = cap.read()
+        if not ret:
+            continue
+        frame = Frame(index, time.perf_counter(), image)
+        index += 1
+        stats.record(frame.captured_at - started)
+        for slot in slots:
+            slot.put(frame)
+    stop.set()  # the camera went away; let the render loop exit
+
+
+def decode_loop(
+    frames: LatestSlot[Frame],
+    results: LatestResult,
+    stats: StageStats,
+    stop: threading.Event,
+    adaptive: bool = False,
+) -> None:
+    # Each worker tracks its own ROI and previous frame, so no state is shared.
+    decoder = AdaptiveDecoder() if adaptive else None
+    while not stop.is_set():
+        frame = frames.get(timeout=0.1)
+        if frame is None:
+            continue
+        result = decode_frame(frame, decoder)
+        stats.record(result.decoded_at - frame.captured_at)
+        if results.publish(result):
+            for detection in result.detections:
+                logging.info("Decoded data: %s", detection.data)
+
+
+def expand_inputs(patterns: Iterable[str]) -> list[Path]:
+    """Resolve files, directories and glob patterns to supported media files, in order."""
+
+    supported = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+    paths: list[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = sorted(path.rglob("*"))
+        elif path.exists():
+            candidates = [path]
+        else:
+            candidates = sorted(Path(match) for match in glob.glob(pattern, recursive=True))
+        paths += [
+            candidate
+            for candidate in candidates
+            if candidate.is_file() and candidate.suffix.lower() in supported
+        ]
+    return list(dict.fromkeys(paths))
+
+
+def batch_tasks(paths: list[Path], chunk_frames: int) -> Iterator[tuple[str, Any, int, int]]:
+    """("images", [paths], 0, 0) or ("video", path, first, stop) tasks, in ``paths`` order.
+
+    Consecutive images are grouped into chunks of up to chunk_frames; a video
+    closes the current group and is split into chunk_frames frame ranges.
+    """
+
+    images: list[str] = []
+    for path in paths:
+        if path.suffix.lower() in IMAGE_EXTENSIONS:
+            images.append(str(path))
+            if len(images) == chunk_frames:
+                yield "images", images, 0, 0
+                images = []
+            continue
+        if path.suffix.lower() not in VIDEO_EXTENSIONS:
+            continue
+        if images:
+            yield "images", images, 0, 0
+            images = []
+        cap = cv2.VideoCapture(str(path))
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        if count <= 0:
+            # Unknown length: one task reads the whole file.
+            yield "video", str(path), 0, -1
+            continue
+        for start in range(0, count, chunk_frames):
+            yield "video", str(path), start, min(start + chunk_frames, count)
+    if images:
+        yield "images", images, 0, 0
+
+
+def detection_records(
+    source: str,
+    frame: int,
+    timestamp: float | None,
+    image: Any,
+    decoder: AdaptiveDecoder | None = None,
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "source": source,
+            "frame": frame,
+            "timestamp": timestamp,
+            "type": barcode.type,
+            "data": barcode.data.decode("utf-8", errors="replace"),
+            "rect": list(barcode.rect),
+        }
+        for barcode in (decoder.decode(image) if decoder else decode(image))
+    ]
+
+
+def run_batch_task(
+    task: tuple[str, Any, int, int], adaptive: bool = False
+) -> tuple[int, list[dict[str, Any]]]:
+    """Decode one task; returns the number of frames read and the detection records."""
+
+    kind, source, first, stop = task
+    records: list[dict[str, Any]] = []
+    if kind == "images":
+        # Separate scans share no ROI or frame history, so only video gets the adaptive decoder.
+        for path in source:
+            image = cv2.imread(path)
+            if image is None:
+                logging.warning("Could not read image %s.", path)
+                continue
+            records += detection_records(path, 0, None, image)
+        return len(source), records
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        logging.warning("Could not open video %s.", source)
+        return 0, records
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    decoder = AdaptiveDecoder() if adaptive else None
+    if first:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    frame = first
+    try:
+        while stop < 0 or frame < stop:
+            ret, image = cap.read()
+            if not ret:
+                break
+            timestamp = frame / fps if fps > 0 else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            records += detection_records(source, frame, round(timestamp, 6), image, decoder)
+            frame += 1
+    finally:
+        cap.release()
+    return frame - first, records
+
+
+def run_batch(
+    patterns: Iterable[str],
+    out: TextIO,
+    workers: int | None,
+    chunk_frames: int = CHUNK_FRAMES,
+    adaptive: bool = False,
+) -> dict[str, float]:
+    """Decode every input headlessly and write one JSON line per detection, in input order."""
+
+    paths = expand_inputs(patterns)
+    tasks = list(batch_tasks(paths, max(1, chunk_frames)))
+    started = time.perf_counter()
+    frames = detections = 0
+    if workers == 1:
+        outcomes = map(run_batch_task, tasks, itertools.repeat(adaptive))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        outcomes = executor.map(run_batch_task, tasks, itertools.repeat(adaptive))
+    try:
+        for count, records in outcomes:
+            frames += count
+            detections += len(records)
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False))
+                out.write("\n")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - started
+    return {
+        "sources": len(paths),
+        "frames": frames,
+        "detections": detections,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def log_stats(stages: list[StageStats], dropped: int) -> None:
+    logging.info(" | ".join(stage.describe() for stage in stages) + f" | dropped {dropped}")
+
+
+def batch_main(args: argparse.Namespace) -> int:
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_batch(
+            args.input, out, args.workers, args.chunk_frames, args.decoder == "adaptive"
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not summary["sources"]:
+        logging.error("No image or video files matched %s.", " ".join(args.input))
+        return 1
+    logging.info(
+        "Decoded %d sources, %d frames, %d detections in %.2f seconds (%.1f fps).",
+        summary["sources"],
+        summary["frames"],
+        summary["detections"],
+        summary["seconds"],
+        summary["fps"],
+    )
+    return 0
+
+
 def main() -> int:
     args = parse_args()
     setup_logging(args.log_file)
 
+    if args.input:
+        return batch_main(args)
+
     cap = cv2.VideoCapture(args.camera_id)
     if not cap.isOpened():
         logging.error("Failed to open camera with ID %s.", args.camera_id)
@@ -54,41 +569,69 @@ def main() -> int:
     if args.height:
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
 
-    font = cv2.FONT_HERSHEY_SIMPLEX
+    stop = threading.Event()
+    decode_slot: LatestSlot[Frame] = LatestSlot()
+    render_slot: LatestSlot[Frame] = LatestSlot()
+    results = LatestResult()
+    capture_stats = StageStats("capture")
+    decode_stats = StageStats("decode")
+    render_stats = StageStats("render")
+    stages = [capture_stats, decode_stats, render_stats]
+
+    threads = [
+        threading.Thread(
+            target=capture_loop,
+            args=(cap, [decode_slot, render_slot], capture_stats, stop),
+            name="capture",
+            daemon=True,
+        )
+    ]
+    threads += [
+        threading.Thread(
+            target=decode_loop,
+            args=(decode_slot, results, decode_stats, stop, args.decoder == "adaptive"),
+            name=f"decode-{number}",
+            daemon=True,
+        )
+        for number in range(max(1, args.decode_workers))
+    ]
+    for thread in threads:
+        thread.start()
+
+    # imshow/waitKey stay on the main thread, which some GUI backends require.
     start_time = time.time()
+    last_report = time.perf_counter()
     try:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                decoded = decode(frame)
-                if decoded:
-                    for barcode in decoded:
-                        x, y, w, h = barcode.rect
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                        barcode_data = barcode.data.decode("utf-8")
-                        frame = cv2.putText(
-                            frame,
-                            barcode_data,
-                            (x, y - 10),
-                            font,
-                            0.5,
-                            (0, 0, 255),
-                            2,
-                            cv2.LINE_AA,
-                        )
-                        logging.info("Decoded data: %s", barcode_data)
-
-                cv2.imshow("frame", frame)
+        while not stop.is_set():
+            frame = render_slot.get(timeout=0.1)
+            if frame is not None:
+                result = results.current()
+                image = frame.image
+                if result and result.detections:
+                    # Decode workers may still be reading frame.image; draw on a copy.
+                    image = draw_overlays(image.copy(), result.detections)
+                cv2.imshow("frame", image)
+                render_stats.record(time.perf_counter() - frame.captured_at)
 
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 break
 
+            if args.stats_interval and time.perf_counter() - last_report >= args.stats_interval:
+                log_stats(stages, decode_slot.dropped)
+                last_report = time.perf_counter()
+
             if args.timeout and (time.time() - start_time) >= args.timeout:
                 logging.info("Timeout reached after %.2f seconds. Exiting.", args.timeout)
                 break
     finally:
+        stop.set()
+        decode_slot.close()
+        render_slot.close()
+        for thread in threads:
+            thread.join(timeout=1.0)
         cap.release()
         cv2.destroyAllWindows()
+        log_stats(stages, decode_slot.dropped)
 
     return 0
 
@@ -1,4 +1,8 @@
-from decimal import Decimal
+import asyncio
+import io
+import json
+import random
+from decimal import Decimal, localcontext
 from types import SimpleNamespace
 
 import pytest
@@ -6,9 +10,18 @@ import pytest
 from calc import (
     HELP_MESSAGE,
     CalculatorState,
+    MemoryStore,
+    compile_expression,
+    compile_pipeline,
+    decimal_power,
+    decimal_sqrt,
     initialize_state,
+    iter_column,
     parse_cli_args,
     process_command,
+    run_batch,
+    run_column,
+    start_server,
 )
 
 
@@ -110,3 +123,284 @@ def test_load_reports_invalid_index():
     should_continue, message = process_command(state, "load 3")
     assert should_continue
     assert message == "Invalid memory index."
+
+
+def test_dispatch_table_resolves_aliases():
+    state = CalculatorState()
+    for line in ["+ 5", "* 3", "/ 5", "s 1", "^ 2", "% 50"]:
+        assert process_command(state, line) == (True, None)
+    assert state.value == Decimal("2")
+
+
+def test_run_batch_skips_blank_and_comment_lines_and_stops_at_exit():
+    state = CalculatorState()
+    out = io.StringIO()
+    lines = ["add 2\n", "\n", "# comment\n", "multiply 5\n", "exit\n", "add 100\n"]
+    executed = run_batch(state, lines, out)
+    assert executed == 3
+    assert state.value == Decimal("10")
+    assert "Bye." in out.getvalue()
+
+
+def test_run_batch_reports_errors_and_continues():
+    state = CalculatorState()
+    out = io.StringIO()
+    run_batch(state, ["add nope", "divide 0", "add 1"], out)
+    assert out.getvalue().splitlines() == ['"nope" is not a number.', "Cannot divide by zero."]
+    assert state.value == Decimal("1")
+
+
+def test_run_batch_reports_arithmetic_errors_and_continues():
+    state = CalculatorState()
+    out = io.StringIO()
+    run_batch(state, ["subtract 4", "power 0.5", "power 1e100", "add 5"], out)
+    assert out.getvalue().splitlines() == [
+        "Cannot compute result: InvalidOperation.",
+        "Cannot compute result: Overflow.",
+    ]
+    assert state.value == Decimal("1")
+
+
+@pytest.mark.parametrize(
+    "expression,expected",
+    [
+        ("(3+4)^2/sqrt(memory[0])", Decimal("7")),
+        ("-2^2", Decimal("-4")),
+        ("2^3^2", Decimal("512")),
+        ("1 + 2 * 3 - 4 / 2", Decimal("5")),
+        ("value * 3 + abs(-1)", Decimal("7")),
+        (".5e1", Decimal("5")),
+    ],
+)
+def test_eval_expression(expression, expected):
+    state = CalculatorState(value=Decimal("2"), memory=[Decimal("49")])
+    should_continue, message = process_command(state, f"eval {expression}")
+    assert should_continue
+    assert message is None
+    assert state.value == expected
+
+
+@pytest.mark.parametrize(
+    "expression,error",
+    [
+        ("1/0", "Cannot divide by zero."),
+        ("sqrt(-1)", "Cannot take square root of a negative number."),
+        ("memory[3]", "Invalid memory index."),
+        ("(1+2", "Unexpected end of expression."),
+        ("foo(1)", 'Unknown name "foo".'),
+        ("1 2", 'Unexpected "2".'),
+    ],
+)
+def test_eval_expression_errors_keep_value(expression, error):
+    state = CalculatorState(value=Decimal("5"))
+    assert process_command(state, f"= {expression}") == (True, error)
+    assert state.value == Decimal("5")
+
+
+@pytest.mark.parametrize("expression", ["(" * 2000 + "1" + ")" * 2000, "-" * 5000 + "1"])
+def test_eval_expression_reports_deep_nesting(expression):
+    state = CalculatorState(value=Decimal("5"))
+    assert process_command(state, f"eval {expression}") == (
+        True,
+        "Expression is too deeply nested.",
+    )
+    assert state.value == Decimal("5")
+
+
+def test_compile_expression_is_cached():
+    first = compile_expression("(1 + value) * 2")
+    assert compile_expression("(1  +  value)   * 2") is first
+    assert first(CalculatorState(value=Decimal("4"))) == Decimal("10")
+
+
+def test_server_keeps_one_state_per_connection_and_pipelines():
+    async def scenario():
+        server = await start_server("127.0.0.1:0", CalculatorState)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            first = await asyncio.open_connection("127.0.0.1", port)
+            second = await asyncio.open_connection("127.0.0.1", port)
+            first[1].write(b"add 2\nmultiply 5\nsave\n")
+            second[1].write(b"add 1\ndivide 0\nexit\n")
+            replies_first = [json.loads(await first[0].readline()) for _ in range(3)]
+            replies_second = [json.loads(await second[0].readline()) for _ in range(3)]
+            closed = await second[0].readline()
+            first[1].close()
+            second[1].close()
+        return replies_first, replies_second, closed
+
+    replies_first, replies_second, closed = asyncio.run(scenario())
+    assert [reply["value"] for reply in replies_first] == ["2", "10", "10"]
+    assert replies_first[2]["message"] == "Saved 10."
+    assert [reply["value"] for reply in replies_second] == ["1", "1", "1"]
+    assert replies_second[1]["message"] == "Cannot divide by zero."
+    assert replies_second[2] == {"value": "1", "message": "Bye.", "continue": False}
+    assert closed == b""
+
+
+def test_server_replies_to_arithmetic_errors_and_keeps_the_connection():
+    async def scenario():
+        server = await start_server("127.0.0.1:0", CalculatorState)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"add 5\nsubtract 10\npower 0.5\npower 1e100\nadd 1\n")
+            replies = [json.loads(await reader.readline()) for _ in range(5)]
+            writer.close()
+        return replies
+
+    replies = asyncio.run(scenario())
+    assert [reply["value"] for reply in replies] == ["5", "-5", "-5", "-5", "-4"]
+    assert replies[2]["message"] == "Cannot compute result: InvalidOperation."
+    assert replies[3]["message"] == "Cannot compute result: Overflow."
+    assert all(reply["continue"] for reply in replies)
+
+
+def test_compile_pipeline_folds_percent_and_rejects_memory_commands():
+    assert compile_pipeline("add 3; % 50; sqrt") == [
+        ("add", Decimal("3")),
+        ("multiply", Decimal("0.5")),
+        ("sqrt", None),
+    ]
+    with pytest.raises(ValueError, match="cannot be used"):
+        compile_pipeline("save")
+    with pytest.raises(ValueError, match="Cannot divide by zero."):
+        compile_pipeline("divide 0")
+
+
+def test_run_column_matches_process_command():
+    pipeline = "add 3; multiply 4; percent 50; power 2; subtract 1; divide 7; sqrt"
+    values = ["1", "2.5", "-2.5", "10"]
+    expected = []
+    for value in values:
+        state = CalculatorState(value=Decimal(value))
+        for command in pipeline.split(";"):
+            process_command(state, command)
+        expected.append(str(state.value))
+
+    out = io.StringIO()
+    written, invalid = run_column(values, compile_pipeline(pipeline), out, use_float=False)
+    assert (written, invalid) == (4, 0)
+    assert out.getvalue().splitlines() == expected
+
+
+@pytest.mark.parametrize("use_float", [False, True])
+def test_run_column_marks_invalid_values_as_nan(use_float):
+    out = io.StringIO()
+    written, invalid = run_column(
+        ["4", "oops", "-1"], compile_pipeline("sqrt"), out, use_float, chunk_size=2
+    )
+    assert (written, invalid) == (3, 1)
+    results = out.getvalue().splitlines()
+    assert Decimal(results[0]) == 2
+    assert [line.lower() for line in results[1:]] == ["nan", "nan"]
+
+
+def test_iter_column_reads_csv_field_by_name_or_index():
+    lines = ["a,b\n", "1,4\n", "2,9\n"]
+    assert list(iter_column(lines, "b")) == ["4", "9"]
+    assert list(iter_column(lines, "0")) == ["1", "2"]
+    assert list(iter_column(["1 x\n", "\n", "# note\n", "2\n"], None)) == ["1", "2"]
+
+
+def test_memory_store_persists_across_sessions(tmp_path):
+    path = str(tmp_path / "memory")
+    with MemoryStore(path) as store:
+        state = CalculatorState(value=Decimal("1.5"), memory=store)
+        process_command(state, "save")
+        state.value = Decimal("-2")
+        process_command(state, "save")
+
+    with MemoryStore(path) as store:
+        assert len(store) == 2
+        state = CalculatorState(memory=store)
+        assert process_command(state, "load 1")[0]
+        assert state.value == Decimal("-2")
+        assert process_command(state, "load 2") == (True, "Invalid memory index.")
+        assert list(store) == [Decimal("1.5"), Decimal("-2")]
+
+
+def test_memory_store_recovers_from_torn_writes(tmp_path):
+    path = str(tmp_path / "memory")
+    with MemoryStore(path, sync=False) as store:
+        for value in range(3):
+            store.append(Decimal(value))
+    with open(path, "ab") as data:
+        data.write(b"123")  # value written, index record never made it
+    with open(path + ".idx", "ab") as index:
+        index.write(b"\x00\x01")  # torn index record
+
+    with MemoryStore(path, sync=False) as store:
+        assert list(store) == [Decimal(0), Decimal(1), Decimal(2)]
+        store.append(Decimal("7"))
+    with MemoryStore(path, sync=False) as store:
+        assert list(store) == [Decimal(0), Decimal(1), Decimal(2), Decimal(7)]
+
+
+def test_memory_store_shared_by_two_sessions(tmp_path):
+    path = str(tmp_path / "memory")
+    with MemoryStore(path, sync=False) as first, MemoryStore(path, sync=False) as second:
+        first.append(Decimal("111111"))
+        second.append(Decimal("2"))
+        first.append(Decimal("3.5"))
+        assert len(first) == 3
+        assert list(first) == [Decimal("111111"), Decimal("2"), Decimal("3.5")]
+    with MemoryStore(path, sync=False) as store:
+        assert list(store) == [Decimal("111111"), Decimal("2"), Decimal("3.5")]
+
+
+def test_initialize_state_with_memory_file(tmp_path):
+    path = str(tmp_path / "memory")
+    args = parse_cli_args(["--memory-file", path, "--memory", "4"])
+    state, message = initialize_state(args)
+    assert message is None
+    assert isinstance(state.memory, MemoryStore)
+    assert list(state.memory) == [Decimal("4")]
+    state.memory.close()
+
+
+@pytest.mark.parametrize("precision", [28, 100, 257, 1000])
+def test_decimal_sqrt_matches_decimal_module(precision):
+    rng = random.Random(precision)
+    values = [Decimal(rng.randrange(1, 10**40)).scaleb(rng.randrange(-60, 60)) for _ in range(200)]
+    values += [Decimal("0"), Decimal("4"), Decimal("1.44"), Decimal("100E+3"), Decimal("0.0001")]
+    with localcontext() as context:
+        context.prec = precision
+        for value in values:
+            assert str(decimal_sqrt(value)) == str(value.sqrt())
+
+
+@pytest.mark.parametrize("precision", [6, 12, 15, 28])
+def test_decimal_power_matches_decimal_module(precision):
+    rng = random.Random(precision)
+    with localcontext() as context:
+        context.prec = precision
+        for _ in range(500):
+            base = +Decimal(rng.uniform(0.001, 1000))
+            exponent = +Decimal(rng.uniform(-20, 20))
+            assert str(decimal_power(base, exponent)) == str(base**exponent)
+        for base, exponent in [("4", "0.5"), ("16", "0.25"), ("0.25", "-0.5"), ("1e6", "0.5")]:
+            expected = Decimal(base) ** Decimal(exponent)
+            assert str(decimal_power(Decimal(base), Decimal(exponent))) == str(expected)
+        assert decimal_power(Decimal(2), Decimal(10)) == Decimal(1024)
+        assert decimal_power(Decimal(-8), Decimal(3)) == Decimal(-512)
+
+
+def test_precision_option_is_validated():
+    args = parse_cli_args(["--precision", "50"])
+    assert args.precision == 50
+    with pytest.raises(SystemExit):
+        parse_cli_args(["--precision", "0"])
+
+
+@pytest.mark.parametrize("scenario", ["mixed", "invalid", "memory"])
+def test_benchmark_scenarios_replay_without_errors(scenario):
+    from bench_calc import SCENARIOS
+
+    lines = SCENARIOS[scenario](2000, seed=1)
+    assert len(lines) == 2000
+    assert lines == SCENARIOS[scenario](2000, seed=1)
+    out = io.StringIO()
+    assert run_batch(CalculatorState(), lines, out) == 2000
+    if scenario == "invalid":
+        assert "Error: command not found" in out.getvalue()
@@ -0,0 +1,147 @@
+import csv
+import io
+
+import pytest
+
+from Collatz import (
+    TrajectoryBinaryWriter,
+    TrajectoryCSVWriter,
+    TrajectoryStats,
+    excursion,
+    export_trajectories,
+    iter_stopping_times,
+    load_binary_trajectories,
+    record_holders,
+    stopping_time,
+    trajectory,
+)
+
+
+def test_stopping_time_known_values():
+    assert [stopping_time(n) for n in range(1, 10)] == [0, 1, 7, 2, 5, 8, 16, 3, 19]
+    assert stopping_time(27) == 111
+    assert stopping_time(837799) == 524
+    assert stopping_time(2**100) == 100  # float division would lose precision here
+
+
+def test_stopping_time_rejects_non_positive():
+    with pytest.raises(ValueError):
+        stopping_time(0)
+
+
+@pytest.mark.parametrize(
+    "first, last, memo_limit", [(1, 3000, 1 << 24), (1, 3000, 50), (500, 900, 64)]
+)
+def test_iter_stopping_times_matches_direct(first, last, memo_limit):
+    expected = [stopping_time(n) for n in range(first, last + 1)]
+    assert list(iter_stopping_times(first, last, memo_limit)) == expected
+
+
+def test_record_holders():
+    records = record_holders(1, iter_stopping_times(1, 1000))
+    assert [n for n, _ in records] == [
+        1, 2, 3, 6, 7, 9, 18, 25, 27, 54, 73, 97, 129, 171, 231, 313, 327, 649, 703, 871
+    ]
+    assert records[-1] == (871, 178)
+
+
+def test_numpy_engine_matches_python():
+    pytest.importorskip("numpy")
+    from Collatz import stopping_times_numpy
+
+    assert list(stopping_times_numpy(1, 5000)) == list(iter_stopping_times(1, 5000))
+    assert list(stopping_times_numpy(700, 1200, memo_limit=800)) == [
+        stopping_time(n) for n in range(700, 1201)
+    ]
+
+
+def test_numpy_engine_streams_bounded_batches(monkeypatch):
+    pytest.importorskip("numpy")
+    from Collatz import iter_stopping_times_numpy
+
+    monkeypatch.setattr("Collatz.NUMPY_BATCH_SIZE", 1000)
+    batches = list(iter_stopping_times_numpy(1, 4500))
+    assert [len(batch) for batch in batches] == [1000, 1000, 1000, 1000, 500]
+    assert [steps for batch in batches for steps in batch] == list(iter_stopping_times(1, 4500))
+
+
+def test_numpy_engine_promotes_values_near_int64_overflow(monkeypatch):
+    pytest.importorskip("numpy")
+    from Collatz import stopping_times_numpy
+
+    monkeypatch.setattr("Collatz.INT64_SAFE", 1000)  # 小さな値で昇格の経路を通す
+    assert list(stopping_times_numpy(1, 3000)) == [stopping_time(n) for n in range(1, 3001)]
+    start = 2**62 - 50  # 3n+1 が int64 を超える開始値
+    monkeypatch.undo()
+    assert list(stopping_times_numpy(start, start + 20)) == [
+        stopping_time(n) for n in range(start, start + 21)
+    ]
+
+
+def test_numpy_engine_handles_starts_beyond_int64():
+    pytest.importorskip("numpy")
+    from Collatz import INT64_SAFE, stopping_times_numpy
+
+    for start in (INT64_SAFE - 5, 2**63 - 8):
+        assert list(stopping_times_numpy(start, start + 10)) == [
+            stopping_time(n) for n in range(start, start + 11)
+        ]
+
+
+@pytest.mark.parametrize("engine, workers", [("python", 1), ("python", 2), ("numpy", 2)])
+def test_sharded_sweep_matches_single_pass(engine, workers, monkeypatch):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    from Collatz import iter_stopping_times_sharded
+
+    monkeypatch.setattr("Collatz.SHARD_SIZE", 300)
+    expected = list(iter_stopping_times(1, 2000))
+    assert list(iter_stopping_times_sharded(engine, 1, 2000, workers)) == expected
+
+
+def test_trajectory_and_excursion_agree():
+    assert list(trajectory(6)) == [6, 3, 10, 5, 16, 8, 4, 2, 1]
+    assert list(trajectory(1)) == [1]
+    for n in range(1, 500):
+        path = list(trajectory(n))
+        assert excursion(n) == (len(path) - 1, max(path))
+        assert len(path) - 1 == stopping_time(n)
+
+
+def test_trajectory_stats_single_pass():
+    stats = export_trajectories(1, 1000)
+    summary = stats.summary()
+    assert summary["count"] == 1000
+    assert sum(summary["histogram"].values()) == 1000
+    assert summary["max_steps"] == 178
+    records = [n for n, _, _ in summary["excursion_records"]]
+    assert records == [1, 2, 3, 7, 15, 27, 255, 447, 639, 703]
+    assert summary["excursion_records"][5] == (27, 9232, 111)
+
+
+def test_binary_export_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr("Collatz.WRITE_CHUNK_BYTES", 64)  # 複数チャンクに分けて書かせる
+    path = tmp_path / "paths.bin"
+    with open(path, "wb") as file:
+        stats = export_trajectories(20, 120, TrajectoryBinaryWriter(file))
+    loaded = list(load_binary_trajectories(str(path)))
+    assert [start for start, _ in loaded] == list(range(20, 121))
+    assert all(values == list(trajectory(start)) for start, values in loaded)
+    assert stats.count == 101
+
+
+def test_csv_export_rows(monkeypatch):
+    monkeypatch.setattr("Collatz.WRITE_CHUNK_BYTES", 16)
+    stream = io.StringIO()
+    export_trajectories(1, 30, TrajectoryCSVWriter(stream))
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert len(rows) == 30
+    assert rows[26] == {"start": "27", "steps": "111", "peak": "9232", "path": rows[26]["path"]}
+    assert rows[26]["path"].split() == [str(value) for value in trajectory(27)]
+
+
+def test_trajectory_stats_accumulates_across_calls():
+    stats = TrajectoryStats()
+    export_trajectories(1, 50, stats=stats)
+    export_trajectories(51, 100, stats=stats)
+    assert stats.summary() == export_trajectories(1, 100).summary()
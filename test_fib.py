@@ -0,0 +1,188 @@
+import sys
+
+import pytest
+
+from fib import (
+    FibCache,
+    digit_count,
+    factorize,
+    fib,
+    fib_mod,
+    fib_mod_batch,
+    fib_range,
+    main,
+    pisano_period,
+    to_decimal,
+)
+
+
+def naive(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def test_fib_matches_iteration():
+    assert [fib(n) for n in range(300)] == [naive(n) for n in range(300)]
+
+
+def test_fib_negative_indices():
+    assert [fib(-n) for n in range(8)] == [0, 1, -1, 2, -3, 5, -8, 13]
+    for n in range(1, 200):
+        assert fib(-n) == (-1) ** (n + 1) * fib(n)
+
+
+def test_fib_large_index_identities():
+    n = 100_003
+    assert fib(2 * n) == fib(n) * (2 * fib(n + 1) - fib(n))
+    assert fib(n + 1) ** 2 - fib(n + 2) * fib(n) == (-1) ** n  # Cassini
+
+
+def test_fib_rejects_float_index():
+    with pytest.raises(TypeError):
+        fib(10.0)
+
+
+def test_backends_agree():
+    pytest.importorskip("gmpy2")
+    for n in (-12, 0, 1, 2, 97, 10_000):
+        assert fib(n, "gmpy2") == fib(n, "python")
+
+
+def test_gmpy2_backend_returns_plain_ints():
+    pytest.importorskip("gmpy2")
+    assert all(type(fib(n, "gmpy2")) is int for n in (-12, 0, 1, 2, 97))
+    assert all(type(value) is int for value in fib_range(0, 5, "gmpy2"))
+
+
+@pytest.mark.parametrize("use_gmpy2", [False, True])
+def test_to_decimal_matches_str(use_gmpy2, monkeypatch):
+    if use_gmpy2:
+        pytest.importorskip("gmpy2")
+    else:
+        monkeypatch.setattr("fib.gmpy2", None)  # forces decimal_string
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    try:
+        for value in (0, 7, -10**30, 2**640 - 1, fib(50_000, "python"), -fib(20_001, "python")):
+            assert to_decimal(value) == str(value)
+    finally:
+        sys.set_int_max_str_digits(limit)
+
+
+def test_digit_count_at_powers_of_ten():
+    for exponent in range(1, 400):
+        assert digit_count(10**exponent - 1) == exponent
+        assert digit_count(10**exponent) == exponent + 1
+        assert digit_count(-(10**exponent)) == exponent + 1
+    assert digit_count(0) == 1
+
+
+def test_cli_writes_hex_and_digit_count(tmp_path, capsys):
+    path = tmp_path / "fib.txt"
+    main(["1000", "--hex", "--output", str(path)])
+    assert path.read_text(encoding="utf-8") == format(fib(1000), "#x") + "\n"
+    main(["100000", "--digits"])
+    assert capsys.readouterr().out == "20899\n"
+
+
+def test_fib_range_matches_fib():
+    assert list(fib_range(-6, 40)) == [fib(n) for n in range(-6, 41)]
+    assert list(fib_range(5000, 5010, "python")) == [fib(n) for n in range(5000, 5011)]
+    assert list(fib_range(10, 9)) == []
+
+
+def test_cli_range_streams_to_file(tmp_path):
+    path = tmp_path / "range.txt"
+    main(["--range", "-2", "6", "--output", str(path)])
+    assert path.read_text(encoding="utf-8").split() == ["-1", "1", "0", "1", "1", "2", "3", "5", "8"]
+
+
+def test_fib_mod_matches_fib():
+    for modulus in (1, 2, 10, 97, 1000, 2**64 + 13):
+        for n in range(-30, 200, 7):
+            assert fib_mod(n, modulus) == fib(n) % modulus
+    assert fib_mod(10**18, 10**9 + 7) == 209783453
+
+
+def brute_force_period(modulus):
+    a, b, length = 0, 1 % modulus, 0
+    while True:
+        a, b = b, (a + b) % modulus
+        length += 1
+        if (a, b) == (0, 1 % modulus):
+            return length
+
+
+def test_pisano_period_matches_brute_force():
+    for modulus in range(1, 600):
+        assert pisano_period(modulus) == brute_force_period(modulus)
+    assert pisano_period(10**18) == 15 * 10**17
+
+
+def test_factorize_large_semiprime():
+    assert factorize(1000000007 * 998244353 * 2**4) == {2: 4, 998244353: 1, 1000000007: 1}
+
+
+@pytest.mark.parametrize("modulus", [1000, 2**61 - 1])
+def test_fib_mod_batch_matches_fib_mod(modulus):
+    indices = [-7, 0, 1, 5, 10**18, 3 * 10**17 + 11]
+    assert fib_mod_batch(indices, modulus) == [fib_mod(n, modulus) for n in indices]
+
+
+def test_fib_mod_rejects_bad_modulus():
+    with pytest.raises(ValueError):
+        fib_mod(10, 0)
+
+
+def test_cli_mod_and_range(capsys):
+    main(["10", "11", "--mod", "7"])
+    assert capsys.readouterr().out == "6\n5\n"
+    main(["--range", "1", "6", "--mod", "4"])
+    assert capsys.readouterr().out.split() == ["1", "1", "2", "3", "1", "0"]
+    main(["--pisano", "--mod", "10"])
+    assert capsys.readouterr().out == "60\n"
+
+
+def test_fib_cache_gives_same_results():
+    cache = FibCache()
+    for n in [*range(-40, 400, 13), 50_000, 50_001, 100_003]:
+        assert fib(n, cache=cache) == fib(n)
+    assert 50_000 >> 1 in cache
+
+
+def test_fib_cache_stays_within_byte_budget():
+    budget = 64 * 1024
+    cache = FibCache(max_bytes=budget)
+    for n in range(1000, 200_000, 9973):
+        assert fib(n, "python", cache) == fib(n, "python")
+        assert cache.bytes <= budget
+    assert 0 < len(cache) < 200
+
+
+def test_fib_cache_evicts_least_recently_used():
+    small = (fib(1000, "python"), fib(1001, "python"))
+    size = sys.getsizeof(small[0]) + sys.getsizeof(small[1])
+    cache = FibCache(max_bytes=2 * size + size // 2)
+    cache.put(1, small)
+    cache.put(2, small)
+    cache.get(1)
+    cache.put(3, small)
+    assert 1 in cache and 3 in cache and 2 not in cache
+    cache.put(4, (10**100_000, 10**100_000))  # larger than the whole budget
+    assert 4 not in cache and len(cache) == 2
+
+
+def test_fib_cache_checkpoints_persist(tmp_path):
+    n = 300_007
+    expected = fib(n, "python")
+    assert fib(n, "python", FibCache(directory=str(tmp_path), checkpoint_min_index=1024)) == expected
+    assert list(tmp_path.glob("*.pair"))
+
+    resumed = FibCache(directory=str(tmp_path), checkpoint_min_index=1024)
+    assert fib(n, "python", resumed) == expected
+    assert n >> 1 in resumed  # loaded from disk instead of recomputed
+
+    next(tmp_path.glob("*.pair")).write_bytes(b"\x05")  # torn checkpoint is ignored
+    assert fib(n, "python", FibCache(directory=str(tmp_path), checkpoint_min_index=1024)) == expected
@@ -0,0 +1,271 @@
+import argparse
+import csv
+import io
+import json
+import math
+import random
+
+import pytest
+
+from gacha import (
+    BinaryRecordWriter,
+    ProgressReporter,
+    StreamingSummary,
+    SweepCache,
+    TraceLog,
+    bounded_positive_int,
+    exact_distribution,
+    exact_moments,
+    exact_summary,
+    iter_chunks,
+    parse_args,
+    probability_percentage,
+    load_binary_record,
+    save_csv,
+    save_json,
+    simulate_trials,
+    simulate_trials_numpy,
+    simulate_trials_sharded,
+    summarize,
+    sweep,
+    track_progress,
+    value_list,
+)
+
+
+def test_simulate_trials_is_seed_reproducible():
+    first = simulate_trials(0.3, 5, 20, random.Random(1))
+    second = simulate_trials(0.3, 5, 20, random.Random(1))
+    assert first == second
+    assert len(first) == 20
+    assert all(total >= 5 for total in first)
+
+
+def test_summarize_reports_basic_statistics():
+    summary = summarize([3, 5, 5, 7])
+    assert summary["trials"] == 4
+    assert summary["total_attempts"] == 20
+    assert summary["average_attempts"] == 5
+    assert summary["variance"] == 2
+    assert summary["max_attempts"] == 7
+    assert summary["min_attempts"] == 3
+    assert summary["histogram"] == {3: 1, 5: 2, 7: 1}
+
+
+def test_numpy_engine_is_seed_reproducible():
+    np = pytest.importorskip("numpy")
+    first = simulate_trials_numpy(0.2, 10, 50, np.random.default_rng(7))
+    second = simulate_trials_numpy(0.2, 10, 50, np.random.default_rng(7))
+    assert first == second
+    assert len(first) == 50
+    assert all(isinstance(total, int) and total >= 10 for total in first)
+
+
+def test_numpy_engine_matches_python_engine_mean():
+    np = pytest.importorskip("numpy")
+    characters, trials, probability = 20, 2000, 0.25
+    python_mean = summarize(simulate_trials(probability, characters, trials, random.Random(0)))[
+        "average_attempts"
+    ]
+    numpy_mean = summarize(
+        simulate_trials_numpy(probability, characters, trials, np.random.default_rng(0))
+    )["average_attempts"]
+    expected = characters / probability
+    assert python_mean == pytest.approx(expected, rel=0.02)
+    assert numpy_mean == pytest.approx(expected, rel=0.02)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_sharded_results_do_not_depend_on_worker_count(engine, monkeypatch):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    monkeypatch.setattr("gacha.SHARD_TRIALS", 7)
+    single = simulate_trials_sharded(engine, 0.4, 3, 30, seed=5, workers=1)
+    pooled = simulate_trials_sharded(engine, 0.4, 3, 30, seed=5, workers=3)
+    assert single == pooled
+    assert len(single) == 30
+
+
+@pytest.mark.parametrize(
+    "record",
+    [[], [4], [3, 5, 5, 7], [10, 12, 11, 40, 10, 13, 12]],
+)
+def test_streaming_summary_matches_summarize(record):
+    accumulator = StreamingSummary()
+    accumulator.update(record)
+    assert accumulator.summary() == summarize(record)
+
+
+def test_streaming_summary_merge_matches_single_pass():
+    record = simulate_trials(0.2, 4, 100, random.Random(3))
+    left, right = StreamingSummary(), StreamingSummary()
+    left.update(record[:37])
+    right.update(record[37:])
+    left.merge(right)
+    assert left.summary() == summarize(record)
+
+
+def test_json_writer_streams_valid_payload(tmp_path):
+    record = [3, 5, 5, 7]
+    summary = summarize(record)
+    path = tmp_path / "result.json"
+    save_json(str(path), record, summary, 25.0, 1, 4, seed=None)
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert payload["parameters"] == {
+        "probability_percent": 25.0,
+        "characters": 1,
+        "trials": 4,
+        "seed": None,
+    }
+    assert payload["record"] == record
+    assert payload["summary"]["histogram"] == {"3": 1, "5": 2, "7": 1}
+
+
+def test_csv_writer_keeps_columns_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("gacha.WRITE_CHUNK_SIZE", 2)
+    path = tmp_path / "result.csv"
+    save_csv(str(path), [3, 5, 5, 7, 9], 25.0, 1, seed=4)
+    with open(path, encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["trial_index"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert [row["attempts"] for row in rows] == ["3", "5", "5", "7", "9"]
+    assert rows[-1]["seed"] == "4"
+
+
+def test_binary_writer_round_trip(tmp_path):
+    record = simulate_trials(0.3, 3, 50, random.Random(2))
+    path = str(tmp_path / "result.bin")
+    writer = BinaryRecordWriter(path, {"characters": 3})
+    for chunk in iter_chunks(record, 16):
+        writer.write(chunk)
+    writer.close(summarize(record))
+    header, loaded = load_binary_record(path)
+    assert header["count"] == 50
+    assert header["parameters"] == {"characters": 3}
+    assert list(loaded) == record
+
+
+def test_exact_distribution_is_normalized():
+    attempts, masses = exact_distribution(0.03, 7)
+    assert attempts[0] == 7
+    assert attempts == list(range(attempts[0], attempts[-1] + 1))
+    assert math.fsum(masses) == pytest.approx(1.0, abs=1e-12)
+
+
+def test_exact_summary_handles_certain_success():
+    summary = exact_summary(1.0, 5, percentiles=[50, 99], tails=[4, 5])
+    assert summary["average_attempts"] == 5
+    assert summary["variance"] == 0
+    assert summary["percentiles"] == {50: 5, 99: 5}
+    assert summary["tail_probabilities"] == {4: 1.0, 5: 0.0}
+
+
+def test_exact_summary_geometric_tail():
+    summary = exact_summary(0.5, 1, tails=[0, 1, 3])
+    assert summary["tail_probabilities"] == pytest.approx({0: 1.0, 1: 0.5, 3: 0.125})
+
+
+def test_exact_distribution_rejects_wide_distributions_up_front():
+    with pytest.raises(ValueError):
+        exact_distribution(0.0001, 1_000_000)
+    assert exact_moments(0.0001, 1_000_000)["average_attempts"] == pytest.approx(1e10)
+
+
+def test_exact_summary_histogram_is_optional():
+    summary = exact_summary(0.03, 7, histogram=False)
+    assert "histogram" not in summary
+    assert summary["mode_attempts"] == exact_summary(0.03, 7)["mode_attempts"]
+
+
+def test_exact_summary_agrees_with_simulation():
+    probability, characters, trials = 0.2, 3, 20_000
+    record = simulate_trials(probability, characters, trials, random.Random(11))
+    simulated = summarize(record)
+    exact = exact_summary(probability, characters, percentiles=[50, 90], tails=[20])
+
+    assert simulated["average_attempts"] == pytest.approx(exact["average_attempts"], rel=0.02)
+    assert simulated["variance"] == pytest.approx(exact["variance"], rel=0.05)
+    for attempts in range(characters, 30):
+        frequency = simulated["histogram"].get(attempts, 0) / trials
+        assert frequency == pytest.approx(exact["histogram"][attempts], abs=0.01)
+    ordered = sorted(record)
+    assert abs(ordered[trials // 2] - exact["percentiles"][50]) <= 1
+    assert abs(ordered[trials * 9 // 10] - exact["percentiles"][90]) <= 1
+    tail = sum(total > 20 for total in record) / trials
+    assert tail == pytest.approx(exact["tail_probabilities"][20], abs=0.01)
+
+
+def test_value_list_parses_ranges_and_lists():
+    assert value_list(float)("0.5:2:0.5") == [0.5, 1.0, 1.5, 2.0]
+    assert value_list(int)("1:5:2") == [1, 3, 5]
+    assert value_list(int)("1,5,10") == [1, 5, 10]
+    with pytest.raises(argparse.ArgumentTypeError):
+        value_list(int)("1:5")
+
+
+def test_value_list_keeps_large_integer_ranges_exact():
+    trials = value_list(bounded_positive_int("trials", 1_000_000))
+    assert trials("250000:1000000:250000") == [250_000, 500_000, 750_000, 1_000_000]
+    assert value_list(int)("1234567:1234569:1") == [1234567, 1234568, 1234569]
+    assert value_list(probability_percentage)("1:3:1") == [1.0, 2.0, 3.0]
+
+
+def test_sweep_reuses_cached_points(tmp_path):
+    cache = SweepCache(str(tmp_path / "cache.db"))
+    points = [(10.0, 2, 50), (20.0, 2, 50)]
+    first = sweep(points, "python", seed=1, workers=None, cache=cache)
+    second = sweep(points + [(30.0, 2, 50)], "python", seed=1, workers=None, cache=cache)
+    cache.close()
+
+    assert [row["cached"] for row in first] == [False, False]
+    assert [row["cached"] for row in second] == [True, True, False]
+    for before, after in zip(first, second):
+        assert {**before, "cached": True} == after
+
+    standalone = summarize(simulate_trials(0.1, 2, 50, random.Random(1)))
+    assert first[0]["average_attempts"] == standalone["average_attempts"]
+    assert first[0]["max_attempts"] == standalone["max_attempts"]
+
+
+def test_sweep_workers_do_not_change_point_results():
+    points = [(10.0, 2, 50), (20.0, 3, 40)]
+    assert sweep(points, "python", seed=3, workers=2) == sweep(
+        points, "python", seed=3, workers=None
+    )
+
+
+def test_verbose_is_rejected_with_workers(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["gacha.py", "-p", "5", "-c", "2", "-t", "10", "-v", "-w", "2"])
+    with pytest.raises(SystemExit):
+        parse_args()
+
+
+def test_trace_log_samples_and_bounds_output():
+    stream = io.StringIO()
+    trace = TraceLog(stream, every=2, limit=3, batch=2)
+    for index in range(1, 11):
+        trace.character(index, index)
+    trace.close()
+    lines = stream.getvalue().splitlines()
+    assert lines[:3] == [
+        "character 2: attempts=2",
+        "character 4: attempts=4",
+        "character 6: attempts=6",
+    ]
+    assert "2" in lines[3] and len(lines) == 4
+
+
+def test_trace_does_not_change_results():
+    stream = io.StringIO()
+    traced = simulate_trials(0.3, 4, 10, random.Random(9), TraceLog(stream))
+    assert traced == simulate_trials(0.3, 4, 10, random.Random(9))
+    assert stream.getvalue() == ""  # まだ batch に達していない
+
+
+def test_progress_reporter_is_rate_limited():
+    stream = io.StringIO()
+    reporter = ProgressReporter(total=1000, interval=3600, stream=stream)
+    assert list(track_progress(range(1000), reporter)) == list(range(1000))
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert lines[0].startswith("trial 1000/1000")
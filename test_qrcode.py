@@ -0,0 +1,193 @@
+import io
+import json
+import threading
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyzbar.pyzbar", exc_type=ImportError)  # also skips without libzbar
+
+from qrcode import (  # noqa: E402
+    AdaptiveDecoder,
+    DecodeResult,
+    LatestResult,
+    LatestSlot,
+    StageStats,
+    batch_tasks,
+    decode,
+    expand_inputs,
+    run_batch,
+)
+
+
+def qr_image(text, size=240):
+    code = cv2.QRCodeEncoder.create().encode(text)
+    code = cv2.resize(code, (size - 40, size - 40), interpolation=cv2.INTER_NEAREST)
+    code = cv2.copyMakeBorder(code, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=255)
+    return cv2.cvtColor(code, cv2.COLOR_GRAY2BGR)
+
+
+def frame_with_code(text, x, y, width=640, height=480):
+    frame = np.full((height, width, 3), 128, dtype=np.uint8)
+    frame[y : y + 160, x : x + 160] = qr_image(text, 160)
+    return frame
+
+
+def assert_same_rect(actual, expected, tolerance=2):
+    assert all(abs(a - b) <= tolerance for a, b in zip(actual, expected)), (actual, expected)
+
+
+def write_video(path, texts, fps=10.0):
+    size = 240
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (size, size))
+    if not writer.isOpened():
+        pytest.skip("this OpenCV build cannot write MJPG video")
+    for text in texts:
+        writer.write(qr_image(text, size))
+    writer.release()
+
+
+def test_latest_slot_keeps_only_newest_item():
+    slot = LatestSlot()
+    for item in range(5):
+        slot.put(item)
+    assert slot.get(timeout=0) == 4
+    assert slot.dropped == 4
+    assert slot.get(timeout=0) is None
+
+
+def test_latest_slot_close_wakes_waiting_consumer():
+    slot = LatestSlot()
+    taken = []
+    consumer = threading.Thread(target=lambda: taken.append(slot.get()))
+    consumer.start()
+    slot.close()
+    consumer.join(timeout=1)
+    assert not consumer.is_alive()
+    assert taken == [None]
+
+
+def test_latest_result_ignores_results_from_older_frames():
+    results = LatestResult()
+    assert results.publish(DecodeResult(5, 0.0, 0.1))
+    assert not results.publish(DecodeResult(3, 0.0, 0.2))
+    assert results.current().frame_index == 5
+
+
+def test_stage_stats_reports_rolling_latency():
+    stats = StageStats("decode", window=3)
+    for latency in (1.0, 0.010, 0.020, 0.030):
+        stats.record(latency)
+    snapshot = stats.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["latency_ms"] == pytest.approx(20.0)
+    assert snapshot["p95_ms"] == pytest.approx(30.0)
+
+
+def test_expand_inputs_handles_files_directories_and_globs(tmp_path):
+    (tmp_path / "scans").mkdir()
+    for name in ("b.png", "a.jpg", "notes.txt"):
+        (tmp_path / "scans" / name).write_bytes(b"")
+    video = tmp_path / "clip.avi"
+    video.write_bytes(b"")
+    found = expand_inputs([str(tmp_path / "scans"), str(video), str(tmp_path / "scans" / "*.png")])
+    assert [path.name for path in found] == ["a.jpg", "b.png", "clip.avi"]
+
+
+def test_batch_tasks_chunk_video_frames(tmp_path):
+    video = tmp_path / "clip.avi"
+    write_video(video, [f"frame-{index}" for index in range(10)])
+    tasks = list(batch_tasks([video], chunk_frames=4))
+    assert [(first, stop) for _, _, first, stop in tasks] == [(0, 4), (4, 8), (8, 10)]
+
+
+def test_batch_tasks_keep_images_and_videos_in_input_order(tmp_path):
+    video = tmp_path / "clip.avi"
+    write_video(video, [f"frame-{index}" for index in range(3)])
+    paths = [tmp_path / "a.png", tmp_path / "b.png", video, tmp_path / "c.png"]
+    tasks = list(batch_tasks(paths, chunk_frames=4))
+    assert [(kind, source) for kind, source, _, _ in tasks] == [
+        ("images", [str(paths[0]), str(paths[1])]),
+        ("video", str(video)),
+        ("images", [str(paths[3])]),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_writes_json_lines_in_input_order(tmp_path, workers):
+    for index in range(3):
+        cv2.imwrite(str(tmp_path / f"scan-{index}.png"), qr_image(f"image-{index}"))
+    write_video(tmp_path / "clip.avi", [f"frame-{index}" for index in range(6)], fps=5.0)
+
+    out = io.StringIO()
+    summary = run_batch([str(tmp_path)], out, workers=workers, chunk_frames=2)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert summary["sources"] == 4
+    assert summary["frames"] == 9
+    # clip.avi sorts before scan-*.png, so its frames come first.
+    assert [record["data"] for record in records] == [
+        *(f"frame-{index}" for index in range(6)),
+        *(f"image-{index}" for index in range(3)),
+    ]
+    video_records = records[:6]
+    assert [record["frame"] for record in video_records] == list(range(6))
+    assert [record["timestamp"] for record in video_records] == [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+    assert records[6]["timestamp"] is None and len(records[6]["rect"]) == 4
+
+
+def test_adaptive_decoder_skips_unchanged_frames_and_tracks_the_code():
+    decoder = AdaptiveDecoder()
+    first = decoder.decode(frame_with_code("hello", 100, 80))
+    assert [barcode.data for barcode in first] == [b"hello"]
+    assert decoder.decode(frame_with_code("hello", 100, 80)) == first
+    assert decoder.passes["skip"] == 1
+
+    frame = frame_with_code("hello", 130, 95)
+    moved = decoder.decode(frame)
+    assert [barcode.data for barcode in moved] == [b"hello"]
+    assert decoder.passes["roi"] == 1
+    assert_same_rect(moved[0].rect, decode(frame)[0].rect)  # back in frame coordinates
+
+
+def test_adaptive_decoder_maps_downscaled_rects_back():
+    decoder = AdaptiveDecoder(scale=0.5)
+    frame = frame_with_code("scaled", 300, 200)
+    found = decoder.decode(frame)
+    assert [barcode.data for barcode in found] == [b"scaled"]
+    assert decoder.passes["downscale"] == 1
+    assert_same_rect(found[0].rect, decode(frame)[0].rect, tolerance=4)
+
+
+def test_adaptive_decoder_notices_changed_and_removed_codes():
+    decoder = AdaptiveDecoder()
+    decoder.decode(frame_with_code("first", 100, 80))
+    changed = decoder.decode(frame_with_code("second", 100, 80))
+    assert [barcode.data for barcode in changed] == [b"second"]
+    assert decoder.decode(np.full((480, 640, 3), 128, dtype=np.uint8)) == []
+    assert decoder.passes["skip"] == 0
+
+
+def test_adaptive_decoder_picks_up_a_code_that_fades_in():
+    decoder = AdaptiveDecoder()
+    background = np.full((480, 640, 3), 128, dtype=np.float32)
+    code = frame_with_code("fade", 100, 80).astype(np.float32)
+    found = decoder.decode(background.astype(np.uint8))
+    assert found == []
+    for step in range(1, 61):
+        # Each frame changes by less than DIFF_THRESHOLD, but the change adds up.
+        alpha = step / 60
+        frame = (background * (1 - alpha) + code * alpha).round().astype(np.uint8)
+        found = decoder.decode(frame)
+    assert [barcode.data for barcode in found] == [b"fade"]
+    assert decoder.passes["skip"] > 0
+
+
+def test_adaptive_decoder_forces_a_decode_after_max_skips():
+    decoder = AdaptiveDecoder(max_skips=3)
+    frame = frame_with_code("hello", 100, 80)
+    for _ in range(9):
+        decoder.decode(frame)
+    assert decoder.passes["skip"] == 6
+    assert decoder.passes["roi"] + decoder.passes["downscale"] + decoder.passes["full"] == 3